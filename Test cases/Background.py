@@ -0,0 +1,111 @@
+# ==============================================================================
+#                              -- Test Problem --
+#                  Background Solution of Independent Trusses
+# ==============================================================================
+
+import asyncio
+import threading
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from simpleFEA import *
+from simpleFEA.elements import Link2D
+
+
+time_start = time.time()
+
+# PROBLEM DEFINITION
+# ==================
+
+# The README truss, built in its own scope for each model
+
+def truss(name, load=100):
+    with Scope(name):
+        mat = LinearMaterial(E=5e5)
+        n1 = Node(0, 0)
+        n2 = Node(10, 0)
+        n3 = Node(10, 10)
+        model = Model(name, [
+            Link2D(n1, n2, mat, A=0.25),
+            Link2D(n1, n3, mat, A=0.25),
+            Link2D(n2, n3, mat, A=0.25)
+        ])
+        model.D(n1, x=0, y=0)
+        model.D(n2, y=0)
+        model.F(n3, x=load)
+        model.solver = LinearSolution
+    return model, n3
+
+
+# SOLUTION AND POST-PROCESSING
+# ============================
+
+# Thread pool solve with progress - target values are 0.0306274 and the phases
+# submitted, assembly, solution, recovery, done
+model, n3 = truss('thread')
+phases = []
+future = model.solve_async(progress=lambda m, phase: phases.append(phase))
+print(future.result(), n3.ux, phases)
+assert phases == ['submitted', 'assembly', 'solution', 'recovery', 'done']
+
+# Concurrent asyncio solves of two models - target values are 0.0306274 and
+# twice that, with progress reported in the event loop
+async def solve_both():
+    (m1, a), (m2, b) = truss('async 1'), truss('async 2', load=200)
+    loop_thread = threading.get_ident()
+    threads = set()
+    await asyncio.gather(
+        m1.asolve(progress=lambda m, phase: threads.add(threading.get_ident())),
+        m2.asolve()
+    )
+    return a.ux, b.ux, threads == {loop_thread}
+
+print(asyncio.run(solve_both()))
+
+# Cancelling a running solve - target is a cancelled future; the solve stops
+# at the start of its next phase
+model, n3 = truss('cancel')
+started, proceed = threading.Event(), threading.Event()
+
+def hold(m, phase):
+    if phase == 'assembly':
+        started.set()
+        proceed.wait()
+
+future = model.solve_async(progress=hold)
+started.wait()
+print(future.cancel(), end=' ')
+proceed.set()
+try:
+    future.result()
+except CancelledError:
+    print(future.cancelled(), model.solution)
+assert future.cancelled() and model.solution is None
+
+# Models sharing nodes cannot be solved concurrently - target is an error
+model, n3 = truss('shared')
+with model.scope:
+    other = Model('shared copy', model.elements)
+other.solver = LinearSolution
+started.clear()
+proceed.clear()
+future = model.solve_async(progress=hold)
+started.wait()
+try:
+    other.solve_async()
+except Exception as e:
+    print(e)
+proceed.set()
+future.result()
+print(other.solve_async().result())
+
+# Process pool solve - target value is 0.0306274, assigned to the original nodes
+if __name__ == '__main__':
+    model, n3 = truss('process')
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        print(model.solve_async(executor).result(), n3.ux)
+        assert abs(n3.ux - 0.0306274) < 1e-7
+
+
+# -----------------------------------------------------------------------------
+time_end = time.time()
+print('\nTime elapsed: {} sec'.format(time_end-time_start))
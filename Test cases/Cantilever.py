@@ -0,0 +1,60 @@
+# ==============================================================================
+#                              -- Test Problem --
+#                   Cantilever Beam with Tip Load (Beam2D)
+# ==============================================================================
+
+import time
+from simpleFEA import *
+from simpleFEA.elements import Beam2D
+
+
+time_start = time.time()
+
+# PROBLEM DEFINITION
+# ==================
+
+# Properties
+L = 100        # in
+P = 1000       # lbf
+E = 30e6       # psi
+I = 2          # in^4
+A = 1          # in^2
+n_elem = 10
+
+# Material properties
+mat = LinearMaterial(E=E)
+
+# Mesh
+nodes = [ Node(L*i/n_elem, 0) for i in range(n_elem + 1) ]
+elems = [ Beam2D(nodes[i], nodes[i+1], mat, A, I) for i in range(n_elem) ]
+
+model = Model('Cantilever', elems)
+
+# Loads and BC's
+model.D(nodes[0], x=0, y=0, rotz=0)
+model.F(nodes[-1], y=-P)
+
+
+# SOLUTION AND POST-PROCESSING
+# ============================
+# Solve
+model.solver = LinearSolution
+model.solve()
+
+
+# Results Comparison
+# ------------------
+
+# Tip deflection - target value is -P*L^3/(3*E*I)
+print(nodes[-1].uy, -P*L**3/(3*E*I))
+
+# Tip rotation - target value is -P*L^2/(2*E*I)
+print(nodes[-1].rotz, -P*L**2/(2*E*I))
+
+# Moment at the support - target value is P*L
+print(elems[0].M1, P*L)
+
+
+# -----------------------------------------------------------------------------
+time_end = time.time()
+print('\nTime elapsed: {} sec'.format(time_end-time_start))
@@ -0,0 +1,70 @@
+# ==============================================================================
+#                              -- Test Problem --
+#               Merging Coincident Nodes of a Mesh Stitched from Parts
+# ==============================================================================
+
+import time
+from simpleFEA import *
+from simpleFEA.elements import Link2D
+
+
+time_start = time.time()
+
+# PROBLEM DEFINITION
+# ==================
+
+# The README truss, built as three separately meshed members whose end nodes
+# coincide (to within a small tolerance) instead of being shared
+
+# Material properties
+mat = LinearMaterial(E=5e5)
+
+# Mesh
+e1 = Link2D(Node(0, 0), Node(10, 0), mat, A=0.25)
+e2 = Link2D(Node(0, 0), Node(10, 10), mat, A=0.25)
+e3 = Link2D(Node(10, 1e-9), Node(10, 10), mat, A=0.25)
+
+model = Model('Stitched truss', [e1, e2, e3])
+
+# Loads and BC's
+model.D(e1.n1, x=0, y=0)
+model.D(e3.n1, y=0)
+model.F(e3.n2, x=100)
+
+
+# MERGE
+# =====
+
+# Coincident node groups - target value is 3 groups
+print(model.coincident_nodes(tol=1e-6))
+
+# Merge - target value is 3 nodes remaining
+model.merge_nodes(tol=1e-6)
+print(model.num_nodes, model.nodes)
+
+# Spatial queries on the (cached) node index - target values are node 2 and
+# nodes 2 and 4 (x = 10, the omitted y and z bounds are unbounded)
+index = model.node_index
+print(index.nearest(9, 0.5), index.in_box(x_min=9, x_max=11))
+assert model.node_index is index
+
+
+# SOLUTION AND POST-PROCESSING
+# ============================
+model.solver = LinearSolution
+model.solve()
+
+
+# Results Comparison
+# ------------------
+
+# Loaded node deformation - target values are 0.0306274, -0.008
+print(e2.n2.ux, e2.n2.uy)
+
+# Element axial force - target value is 141.421
+print(e2.F)
+
+
+# -----------------------------------------------------------------------------
+time_end = time.time()
+print('\nTime elapsed: {} sec'.format(time_end-time_start))
@@ -0,0 +1,70 @@
+# ==============================================================================
+#                              -- Test Problem --
+#             Cantilever Beam Propped by a Tie Rod (Beam2D + Link2D)
+# ==============================================================================
+
+import time
+from simpleFEA import *
+from simpleFEA.elements import Beam2D, Link2D
+
+
+time_start = time.time()
+
+# PROBLEM DEFINITION
+# ==================
+
+# Properties
+L = 100        # in, beam length
+Lr = 50        # in, tie rod length
+P = 1000       # lbf
+E = 30e6       # psi
+I = 2          # in^4
+A = 1          # in^2, beam area
+Ar = 0.01      # in^2, rod area
+n_elem = 4
+
+# The beam tip and rod act as parallel springs
+k_beam = 3*E*I/L**3
+k_rod = E*Ar/Lr
+delta = -P/(k_beam + k_rod)
+
+# Material properties
+mat = LinearMaterial(E=E)
+
+# Mesh
+nodes = [ Node(L*i/n_elem, 0) for i in range(n_elem + 1) ]
+beams = [ Beam2D(nodes[i], nodes[i+1], mat, A, I) for i in range(n_elem) ]
+anchor = Node(L, Lr)
+rod = Link2D(anchor, nodes[-1], mat, Ar)
+
+model = Model('Propped cantilever', beams + [rod])
+
+# Loads and BC's
+model.D(nodes[0], x=0, y=0, rotz=0)
+model.D(anchor, x=0, y=0)
+model.F(nodes[-1], y=-P)
+
+
+# SOLUTION AND POST-PROCESSING
+# ============================
+# Solve
+model.solver = LinearSolution
+model.solve()
+
+
+# Results Comparison
+# ------------------
+
+# Tip deflection - target value is -P/(k_beam + k_rod)
+print(nodes[-1].uy, delta)
+
+# Rod axial force - target value is -k_rod*delta (tension)
+print(rod.F, -k_rod*delta)
+
+# Moment at the support - target value is (P + k_rod*delta)*L
+print(beams[0].M1, (P + k_rod*delta)*L)
+
+
+# -----------------------------------------------------------------------------
+time_end = time.time()
+print('\nTime elapsed: {} sec'.format(time_end-time_start))
@@ -0,0 +1,67 @@
+# ==============================================================================
+#                              -- Test Problem --
+#          Mixed vs Double Precision Solution of a Cantilever (Beam2D)
+# ==============================================================================
+
+import time
+import numpy as np
+from simpleFEA import *
+from simpleFEA.elements import Beam2D
+
+
+time_start = time.time()
+
+# PROBLEM DEFINITION
+# ==================
+
+# Properties
+L = 100        # in
+P = 1000       # lbf
+E = 30e6       # psi
+I = 2          # in^4
+A = 1          # in^2
+n_elem = 200
+
+# Material properties
+mat = LinearMaterial(E=E)
+
+# Mesh
+nodes = [ Node(L*i/n_elem, 0) for i in range(n_elem + 1) ]
+elems = [ Beam2D(nodes[i], nodes[i+1], mat, A, I) for i in range(n_elem) ]
+
+model = Model('Cantilever', elems)
+
+# Loads and BC's
+model.D(nodes[0], x=0, y=0, rotz=0)
+model.F(nodes[-1], y=-P)
+
+
+# SOLUTION AND POST-PROCESSING
+# ============================
+model.solver = LinearSolution
+
+# Double precision direct solve
+model.solve()
+U_double = model.solution.U_total
+
+# Single precision factorization with iterative refinement
+model.solve(precision='mixed')
+U_mixed = model.solution.U_total
+
+
+# Results Comparison
+# ------------------
+
+# Relative displacement difference - target value is ~0 (< 1e-6)
+print(np.abs(U_mixed - U_double).max()/np.abs(U_double).max())
+
+# Tip deflection - target value is -P*L^3/(3*E*I)
+print(nodes[-1].uy, -P*L**3/(3*E*I))
+
+# Backward error after each refinement step - target final value < 1e-14
+print(model.solution.backward_errors)
+
+
+# -----------------------------------------------------------------------------
+time_end = time.time()
+print('\nTime elapsed: {} sec'.format(time_end-time_start))
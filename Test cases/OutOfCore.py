@@ -0,0 +1,79 @@
+# ==============================================================================
+#                              -- Test Problem --
+#              Out-of-Core vs In-Core Solution of a Lattice Truss
+# ==============================================================================
+
+import time
+import numpy as np
+from simpleFEA import *
+from simpleFEA.elements import Link2D
+
+
+time_start = time.time()
+
+# PROBLEM DEFINITION
+# ==================
+
+# Properties
+n_bays = 50
+a = 12         # in, bay width and height
+A = 0.5        # in^2
+F = 1000       # lbf
+E = 30e6       # psi
+
+# Material properties
+mat = LinearMaterial(E=E)
+
+# Mesh
+bottom = [ Node(a*i, 0) for i in range(n_bays + 1) ]
+top = [ Node(a*i, a) for i in range(n_bays + 1) ]
+elems = [ Link2D(b, t, mat, A) for b,t in zip(bottom, top) ]
+for i in range(n_bays):
+    elems += [
+        Link2D(bottom[i], bottom[i+1], mat, A),
+        Link2D(top[i], top[i+1], mat, A),
+        Link2D(bottom[i], top[i+1], mat, A)
+    ]
+
+model = Model('Lattice truss', elems)
+
+# Loads and BC's
+model.D(bottom[0], x=0, y=0)
+model.D(top[0], x=0, y=0)
+model.F(top[-1], y=-F)
+
+
+# SOLUTION AND POST-PROCESSING
+# ============================
+model.solver = LinearSolution
+
+# In-core direct solve
+model.solve()
+U_in = model.solution.U_total
+F_in = model.solution.F_total
+
+# Out-of-core iterative solve with a small budget forcing many chunks
+tol = 1e-8
+model.solve(out_of_core=True, memory_budget=64*2**10, tol=tol)
+U_out = model.solution.U_total
+F_out = model.solution.F_total
+
+
+# Results Comparison
+# ------------------
+
+# Relative displacement difference - target value is ~0 (< 1e-8)
+print(np.abs(U_out - U_in).max()/np.abs(U_in).max())
+
+# Relative reaction difference - target value is ~0 (< 1e-6)
+print(np.abs(F_out - F_in).max()/np.abs(F_in).max())
+
+# Achieved (true) relative residual of the iterative solve - target value is
+# below the tolerance
+print(model.solution.residual)
+assert model.solution.residual <= tol
+
+
+# -----------------------------------------------------------------------------
+time_end = time.time()
+print('\nTime elapsed: {} sec'.format(time_end-time_start))
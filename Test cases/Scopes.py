@@ -0,0 +1,109 @@
+# ==============================================================================
+#                              -- Test Problem --
+#                   Independent Model Scopes of the README Truss
+# ==============================================================================
+
+import asyncio
+import gc
+import time
+import weakref
+from simpleFEA import *
+from simpleFEA.elements import Link2D
+
+
+time_start = time.time()
+
+# PROBLEM DEFINITION
+# ==================
+
+# The README truss, built in a given scope
+
+def truss(scope, name):
+    with scope:
+        mat = LinearMaterial(E=5e5)
+        n1 = Node(0, 0)
+        n2 = Node(10, 0)
+        n3 = Node(10, 10)
+        model = Model(name, [
+            Link2D(n1, n2, mat, A=0.25),
+            Link2D(n1, n3, mat, A=0.25),
+            Link2D(n2, n3, mat, A=0.25)
+        ])
+        model.D(n1, x=0, y=0)
+        model.D(n2, y=0)
+        model.F(n3, x=100)
+        model.solver = LinearSolution
+    return model, n3
+
+
+# Independent Numbering
+# ---------------------
+
+# Both models are numbered from 1 - target values are nodes [1, 2, 3] and
+# elements [1, 2, 3] in each scope, with the same solution
+s1, s2 = Scope('one'), Scope('two')
+m1, a = truss(s1, 'one')
+m2, b = truss(s2, 'two')
+m1.solve()
+m2.solve()
+print(m1.node_nums.tolist(), m2.node_nums.tolist(), m1.element_nums.tolist(), m2.element_nums.tolist())
+print(a.ux, b.ux)
+assert m1.node_nums.tolist() == m2.node_nums.tolist() == [1, 2, 3]
+assert a.ux == b.ux
+
+# Entities created outside a scope do not join it - target value is 3 nodes
+Node(0, 0)
+print(len(s1.nodes))
+assert len(s1.nodes) == 3
+
+# Elements of another scope are rejected - target is an error
+try:
+    m1.add_elems(m2.elements[0])
+except Exception as e:
+    print(e)
+
+
+# Concurrent Use of One Scope
+# ---------------------------
+
+# Two tasks entering the same scope - target values are True, True and 2 nodes
+shared = Scope('shared')
+
+async def make_node(x):
+    with shared:
+        await asyncio.sleep(0.01)
+        n = Node(x, 0)
+    return n.scope is shared
+
+async def make_both():
+    return await asyncio.gather(make_node(0), make_node(1))
+
+print(asyncio.run(make_both()), len(shared.nodes))
+assert len(shared.nodes) == 2
+
+
+# Releasing Models and Scopes
+# ---------------------------
+
+# Dropped models and closed scopes are freed without the cycle collector -
+# target values are True, True
+gc.disable()
+model_ref = weakref.ref(m1)
+del m1
+print(model_ref() is None, end=' ')
+
+node_ref = weakref.ref(b)
+s2.close()
+del m2, b
+print(node_ref() is None)
+gc.enable()
+assert model_ref() is None and node_ref() is None
+
+# A closed scope restarts numbering - target value is node 1
+with s2:
+    print(Node(0, 0).num)
+
+
+# -----------------------------------------------------------------------------
+time_end = time.time()
+print('\nTime elapsed: {} sec'.format(time_end-time_start))
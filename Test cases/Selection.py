@@ -0,0 +1,118 @@
+# ==============================================================================
+#                              -- Test Problem --
+#               Node and Element Selections of the README Truss
+# ==============================================================================
+
+import io
+import time
+from simpleFEA import *
+from simpleFEA.elements import Link2D
+
+
+time_start = time.time()
+
+# PROBLEM DEFINITION
+# ==================
+
+# The README truss, with the vertical member in a second material
+
+# Material properties
+steel = LinearMaterial(E=5e5)
+alloy = LinearMaterial(E=5e5)
+
+# Mesh
+n1 = Node(0, 0)
+n2 = Node(10, 0)
+n3 = Node(10, 10)
+
+e1 = Link2D(n1, n2, steel, A=0.25)
+e2 = Link2D(n1, n3, steel, A=0.25)
+e3 = Link2D(n2, n3, alloy, A=0.25)
+
+model = Model('Truss', [e1, e2, e3])
+
+# Loads and BC's
+model.D(n1, x=0, y=0)
+model.D(n2, y=0)
+model.F(n3, x=100)
+model.solver = LinearSolution
+
+# Result selections need a solution - target is an error
+try:
+    model.nsel().prnsol
+except Exception as e:
+    print(e)
+
+
+# SOLUTION AND POST-PROCESSING
+# ============================
+model.solve()
+
+
+# Selections
+# ----------
+
+# Nodes at y = 10 - target value is node 3
+top = model.nsel().box(y=(10, 10))
+print(top.items)
+assert top.items == [n3]
+
+# Elements attached to the top nodes - target values are elements 2 and 3
+print(model.esel().attached(top).items)
+assert model.esel().attached(top).items == [e2, e3]
+
+# Elements with all nodes at y = 0 - target value is element 1
+print(model.esel().attached(model.nsel().box(y=(0, 0)), all=True).items)
+
+# Elements by material - target value is element 3
+print(model.esel().material(alloy).items)
+assert model.esel().material(alloy).items == [e3]
+
+# Elements by result - target value is element 2 (Sa = 565.685)
+hot = model.esel().material(steel).result('Sa', min=500, absolute=True)
+print(hot.items, hot.values('Sa')[hot.mask])
+assert hot.items == [e2]
+
+# Nodes by result - target value is node 3 (ux = 0.0306274)
+print(model.nsel().result('ux', min=0.01).items)
+
+# Set operations - target values are elements [2, 3], [3], [1] and nodes [1, 3]
+print((hot | model.esel().attached(top)).nums)
+print((model.esel().attached(top) - hot).nums)
+print((~model.esel().attached(top)).nums)
+print(hot.nodes.nums)
+assert list((hot | model.esel().attached(top)).nums) == [2, 3]
+assert list((~model.esel().attached(top)).nums) == [1]
+
+# CSV export - target is a header and one row per element
+f = io.StringIO()
+model.esel().attached(top).to_csv(f, 'A', 'F', 'Sa')
+print(f.getvalue())
+assert f.getvalue().splitlines()[0] == 'Element,A,F,Sa'
+
+# Reports of the selected entities
+print(top.prnsol)
+print(hot.pretab())
+
+
+# Mesh Changes
+# ------------
+
+# Moving a node updates the extents and location selections - target values
+# are (0, 12, 0, 10, 0, 0) and node 3
+n3.x = 12
+print(model.extents, model.nsel().box(x=(11, 13)).items)
+assert model.extents == (0, 12, 0, 10, 0, 0)
+assert model.nsel().box(x=(11, 13)).items == [n3]
+
+# Results after the mesh changes are rejected - target is an error
+model.remove_elems(e1)
+try:
+    model.esel().pretab()
+except Exception as e:
+    print(e)
+
+
+# -----------------------------------------------------------------------------
+time_end = time.time()
+print('\nTime elapsed: {} sec'.format(time_end-time_start))
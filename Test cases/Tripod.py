@@ -0,0 +1,62 @@
+# ==============================================================================
+#                              -- Test Problem --
+#                     Symmetric Tripod with Apex Load (Link3D)
+# ==============================================================================
+
+import time
+import math
+from simpleFEA import *
+from simpleFEA.elements import Link3D
+
+
+time_start = time.time()
+
+# PROBLEM DEFINITION
+# ==================
+
+# Properties
+R = 60         # in, base radius
+h = 80         # in, apex height
+P = 3000       # lbf
+E = 30e6       # psi
+A = 0.5        # in^2
+
+L = (R**2 + h**2)**0.5
+
+# Material properties
+mat = LinearMaterial(E=E)
+
+# Mesh
+apex = Node(0, 0, h)
+base = [ Node(R*math.cos(math.radians(a)), R*math.sin(math.radians(a)), 0) for a in (0, 120, 240) ]
+legs = [ Link3D(n, apex, mat, A) for n in base ]
+
+model = Model('Tripod', legs)
+
+# Loads and BC's
+model.F(apex, z=-P)
+for n in base:
+    model.D(n, x=0, y=0, z=0)
+
+
+# SOLUTION AND POST-PROCESSING
+# ============================
+# Solve
+model.solver = LinearSolution
+model.solve()
+
+
+# Results Comparison
+# ------------------
+
+# Leg axial force - target value is -P*L/(3*h)
+print([ e.F for e in legs ], -P*L/(3*h))
+
+# Apex deflection - target value is -P*L^3/(3*E*A*h^2), no lateral motion
+print(apex.uz, -P*L**3/(3*E*A*h**2))
+print(apex.ux, apex.uy)
+
+
+# -----------------------------------------------------------------------------
+time_end = time.time()
+print('\nTime elapsed: {} sec'.format(time_end-time_start))
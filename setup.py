@@ -8,7 +8,7 @@ setup(
     packages=['simpleFEA'],
     install_requires=[
         'numpy',
-        'scipy',
+        'scipy>=1.12',
         'matplotlib',
         'tabulate'
     ]
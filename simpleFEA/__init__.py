@@ -1,4 +1,5 @@
 from .preprocessing import Node
 from .application import Model
 from .solution import LinearSolution
-from .materials import LinearMaterial
\ No newline at end of file
+from .materials import LinearMaterial
+from .scope import Scope
\ No newline at end of file
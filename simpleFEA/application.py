@@ -2,9 +2,17 @@
 Project-level classes.
 '''
 
+import asyncio
 import itertools
+import threading
+import numpy as np
+from scipy.sparse import csr_matrix
 from tabulate import tabulate
 from simpleFEA.loads import Force, Displacement
+from simpleFEA.preprocessing import NodeIndex
+from simpleFEA.selection import NodeSelection, ElementSelection
+from simpleFEA import background
+from simpleFEA.scope import current_scope
 
 
 class Model:
@@ -17,10 +25,14 @@ class Model:
     Only elements are added. Nodes are attached to the elements and are included
     implicitly.
 
+    The model belongs to the scope active when it is created (see
+    :mod:`simpleFEA.scope`) and only accepts elements of that scope.
+
     :param str name:    Name of model (optional)
     '''
     def __init__(self, name=None, elems=[]):
         self.name = name if name else ''
+        self.scope = current_scope()
         self._elements = set()
         self._nodes = set()
         self._loads = []
@@ -28,15 +40,84 @@ class Model:
         self._disp = []
         self.solver = None
         self.solution = None
+        self._cache = {}
+        self._lock = threading.RLock()
         if elems:
             self.add_elems(*elems)
+        self.scope.add_model(self)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        state['_cache'] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
     
-    def solve(self):
+    def solve(self, progress=None, cancel=None, **options):
+        '''
+        Solve the model with the assigned solver.
+
+        :param progress:    Callback ``progress(model, phase)`` called at the
+                            start of each solve phase (``'assembly'``,
+                            ``'solution'``, ``'recovery'``) and when ``'done'``
+        :param cancel:      A ``threading.Event`` which cancels the solve at
+                            the next phase when set, raising ``SolveCancelled``
+        :param options:     Keyword options passed to the solver, e.g.
+                            ``out_of_core=True`` for ``LinearSolution``
+        :return:            The solution
+        '''
+        if not self.solver:
+            raise Exception('No solver assigned')
+        with self._lock:
+            self.assign_nodal_DOF_indices()
+            solution = self.solver(self, **options)
+            solution.progress = progress
+            solution.cancel_event = cancel
+            try:
+                solution.solve()
+            finally:
+                # Do not keep callbacks or events, which cannot be pickled
+                solution.progress = None
+                solution.cancel_event = None
+            self.solution = solution
+        if progress:
+            progress(self, 'done')
+        return solution
+
+    def solve_async(self, executor=None, progress=None, **options):
+        '''
+        Solve the model in the background. See :mod:`simpleFEA.background`.
+
+        Models sharing nodes cannot be solved concurrently: an exception is
+        raised if the model shares nodes with another model still being solved
+        in the background.
+
+        :param Executor executor:   Executor to run the solve, defaults to the
+                                    shared pool set with ``background.set_executor``
+        :param progress:            Progress callback, see ``solve``. Called from
+                                    the worker thread.
+        :param options:             Keyword options passed to the solver
+        :return:                    A ``SolveFuture`` resolving to the solution
+        '''
         if not self.solver:
             raise Exception('No solver assigned')
-        self.assign_nodal_DOF_indices()
-        self.solution = self.solver(self)
-        self.solution.solve()
+        return background.submit(self, executor, progress, **options)
+
+    async def asolve(self, executor=None, progress=None, **options):
+        '''
+        Solve the model in the background and await the solution. Progress
+        callbacks are called in the event loop thread and cancelling the
+        awaiting task cancels the solve.
+        '''
+        if progress:
+            loop = asyncio.get_running_loop()
+            callback = lambda model, phase: loop.call_soon_threadsafe(progress, model, phase)
+        else:
+            callback = None
+        return await asyncio.wrap_future(self.solve_async(executor, callback, **options))
     
     @property
     def loads(self):
@@ -53,15 +134,91 @@ class Model:
         '''A list of force loads defined in the model'''
         return list(filter(lambda x: isinstance(x, Force), self.loads))
 
+    def _cached(self, key, func):
+        '''Return a cached mesh quantity, computing it with ``func`` if needed'''
+        if key not in self._cache:
+            self._cache[key] = func()
+        return self._cache[key]
+
+    def _cached_geometry(self, key, func):
+        '''
+        Return a cached quantity depending on node locations, recomputing it
+        if any node of the scope has been moved since it was cached
+        '''
+        if self._cache.get('geometry_version') != self.scope.geometry_version:
+            self._cache.pop('node_coords', None)
+            self._cache.pop('node_index', None)
+            self._cache['geometry_version'] = self.scope.geometry_version
+        return self._cached(key, func)
+
+    def _invalidate(self):
+        '''Clear cached mesh quantities and mark the solution stale after the mesh changes'''
+        self._cache.clear()
+        if self.solution is not None:
+            self.solution.stale = True
+
     @property
     def nodes(self):
         '''A list of the nodes in the model'''
-        return sorted(self._nodes, key=lambda x:x.num)
+        return list(self._cached('nodes', lambda: sorted(self._nodes, key=lambda x:x.num)))
     
     @property
     def elements(self):
         '''A list of the elements in the model'''
-        return sorted(self._elements, key=lambda x:x.num)
+        return list(self._cached('elements', lambda: sorted(self._elements, key=lambda x:x.num)))
+
+    @property
+    def node_coords(self):
+        '''Array of node coordinates, shape ``(num_nodes, 3)``, in ``nodes`` order'''
+        return self._cached_geometry('node_coords', lambda: np.array(
+            [ (n.x, n.y, n.z) for n in self.nodes ], dtype=float
+        ).reshape(-1, 3))
+
+    @property
+    def node_nums(self):
+        '''Array of node numbers in ``nodes`` order'''
+        return self._cached('node_nums', lambda: np.array([ n.num for n in self.nodes ], dtype=int))
+
+    @property
+    def element_nums(self):
+        '''Array of element numbers in ``elements`` order'''
+        return self._cached('element_nums', lambda: np.array([ e.num for e in self.elements ], dtype=int))
+
+    @property
+    def connectivity(self):
+        '''
+        Sparse element-node incidence matrix, shape ``(num_elems, num_nodes)``,
+        with rows and columns in ``elements`` and ``nodes`` order
+        '''
+        def build():
+            pos = { n: i for i,n in enumerate(self.nodes) }
+            elems = self.elements
+            cols = [ pos[n] for e in elems for n in e.nodes ]
+            indptr = np.cumsum([0] + [ len(e.nodes) for e in elems ])
+            return csr_matrix((np.ones(len(cols)), cols, indptr), shape=(len(elems), len(pos)))
+        return self._cached('connectivity', build)
+
+    @property
+    def element_material_ids(self):
+        '''Array of the ``id`` of the element materials in ``elements`` order'''
+        return self._cached('element_material_ids', lambda: np.array(
+            [ id(e.material) for e in self.elements ], dtype=np.int64
+        ))
+
+    @property
+    def element_areas(self):
+        '''Array of element cross sectional areas in ``elements`` order (NaN if undefined)'''
+        return self._cached('element_areas', lambda: np.array(
+            [ getattr(e, 'A', None) for e in self.elements ], dtype=float
+        ))
+
+    def nsel(self):
+        '''Return a ``NodeSelection`` of all nodes in the model'''
+        return NodeSelection(self)
+
+    def esel(self):
+        '''Return an ``ElementSelection`` of all elements in the model'''
+        return ElementSelection(self)
     
     @property
     def num_nodes(self):
@@ -120,7 +277,7 @@ class Model:
         '''Loop through each node and assign their DOFs a global index number'''
         i = 0
         for n in self.nodes:
-            for DOF in n.DOF:
+            for DOF in sorted(n.DOF):
                 n.indices.update({DOF:i})
                 i += 1
         
@@ -135,38 +292,89 @@ class Model:
         Calculate the model bounds in each axis.
         
         Returns a tuple:  (x_min, x_max, y_min, y_max, z_min, z_max)
+
+        The bounds always include the origin.
         '''
-        x_min, x_max, y_min, y_max, z_min, z_max = 0,0,0,0,0,0
-        for n in self.nodes:
-            x_min = min(x_min, n.x)
-            x_max = max(x_max, n.x)
-            y_min = min(y_min, n.y)
-            y_max = max(y_max, n.y)
-            z_min = min(z_min, n.z)
-            z_max = max(z_max, n.z)
-        return (x_min, x_max, y_min, y_max, z_min, z_max)
+        xyz = np.vstack([self.node_coords, np.zeros(3)])
+        lo, hi = xyz.min(axis=0), xyz.max(axis=0)
+        return tuple(float(v) for v in (lo[0], hi[0], lo[1], hi[1], lo[2], hi[2]))
     
     def add_elems(self, *elems):
         '''Add elements to the model'''
+        for e in elems:
+            if e.scope is not self.scope:
+                raise Exception(f'{e} belongs to a different scope than {self}')
         for e in elems:
             self._elements.add(e)
             for n in e.nodes:
                 self._nodes.add(n)
+        self._invalidate()
     
+    @property
+    def node_index(self):
+        '''
+        A spatial index (``NodeIndex``) over the nodes in the model, cached
+        until the mesh changes or a node is moved
+        '''
+        return self._cached_geometry('node_index', lambda: NodeIndex(self.nodes))
+
+    def coincident_nodes(self, tol=1e-8):
+        '''
+        Return groups of nodes located within ``tol`` of each other.
+
+        :param num tol:     Distance tolerance
+        '''
+        return self.node_index.duplicates(tol)
+
+    def merge_nodes(self, tol=1e-8):
+        '''
+        Merge coincident nodes. In each group of nodes within ``tol`` of each
+        other the lowest numbered node is kept; elements and loads attached to
+        the other nodes are moved to it and those nodes are dropped from the
+        model.
+
+        :param num tol:     Distance tolerance
+        :return:            A dict mapping each removed node to its surviving node
+        '''
+        mapping = {}
+        for group in self.coincident_nodes(tol):
+            for n in group[1:]:
+                mapping[n] = group[0]
+
+        # Check that no element would be collapsed before modifying anything
+        for n, keep in mapping.items():
+            for e in n.elements & self._elements:
+                if len(set(mapping.get(m, m) for m in e.nodes)) < len(e.nodes):
+                    raise Exception(f'Merging nodes would collapse {e}.')
+
+        for n, keep in mapping.items():
+            for e in list(n.elements & self._elements):
+                e.replace_node(n, keep)
+            for l in n.loads:
+                l.node = keep
+                keep.loads.append(l)
+            keep.forces.extend(n.forces)
+            keep.disp.extend(n.disp)
+            n.loads, n.forces, n.disp = [], [], []
+            self._nodes.discard(n)
+        self._invalidate()
+        return mapping
+
     def remove_elems(self, *elems):
         '''Remove elements from the model'''
         for e in elems:
             self._elements.remove(e)
+        self._invalidate()
     
-    def F(self,node,x=0,y=0,z=0):
+    def F(self,node,x=0,y=0,z=0,mx=0,my=0,mz=0):
         '''Define a force and apply it to the model'''
-        f = Force(node,x,y,z)
+        f = Force(node,x,y,z,mx,my,mz)
         self._loads.append(f)
         self._forces.append(f)
 
-    def D(self, node,x=None,y=None,z=None):
+    def D(self, node,x=None,y=None,z=None,rotx=None,roty=None,rotz=None):
         '''Define a displacement constraint and apply it to the model'''
-        d = Displacement( node,x,y,z)
+        d = Displacement( node,x,y,z,rotx,roty,rotz)
         self._loads.append(d)
         self._disp.append(d)
 
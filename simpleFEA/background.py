@@ -0,0 +1,173 @@
+'''
+Background (asynchronous) solution of models.
+
+Solves are submitted to an executor - by default a shared thread pool, which
+can be replaced with any ``concurrent.futures`` executor using
+``set_executor``. ``Model.solve_async`` returns a ``SolveFuture`` and
+``Model.asolve`` is the ``asyncio`` equivalent.
+
+A solve only modifies its own model: the model's nodes, elements, cache and
+solution. Concurrent solves of different models therefore do not interfere,
+provided the models do not share nodes. This is checked when a solve is
+submitted: submitting a model that shares nodes with another model still being
+solved in the background raises an exception. Concurrent solves of the same
+model are serialized.
+
+With a ``ProcessPoolExecutor`` the model is pickled to the worker process and
+solved there; the returned results are then assigned to the original model.
+Progress is only reported for the ``'submitted'`` and ``'done'`` phases, and a
+running solve cannot be cancelled.
+'''
+
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from simpleFEA.solution import SolveCancelled
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+_in_flight = {}
+'''Number of background solves submitted and not yet finished, by model'''
+_in_flight_lock = threading.Lock()
+
+
+def get_executor():
+    '''Return the default executor, creating a thread pool on first use'''
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=os.cpu_count(),
+                                           thread_name_prefix='simpleFEA')
+        return _executor
+
+
+def set_executor(executor):
+    '''
+    Set the default executor used by ``Model.solve_async``.
+
+    :param Executor executor:   A ``ThreadPoolExecutor`` or ``ProcessPoolExecutor``
+    '''
+    global _executor
+    with _executor_lock:
+        _executor = executor
+
+
+class SolveFuture(Future):
+    '''
+    A ``Future`` for a background solve, resolving to the model's ``Solution``.
+
+    Unlike a plain ``Future``, a solve that is already running in a thread
+    can be cancelled: it stops at the start of its next phase. ``cancel``
+    returns ``True`` if the cancellation was requested before the solve
+    finished; the future then ends up cancelled unless the solve had already
+    passed its last phase.
+    '''
+    def __init__(self):
+        super().__init__()
+        self.cancel_event = threading.Event()
+        self._inner = None
+        self._interruptible = True
+
+    def cancel(self):
+        if self.done():
+            return False
+        self.cancel_event.set()
+        cancelled = self._inner.cancel() if self._inner is not None else False
+        return cancelled or self._interruptible
+
+    def _complete(self, inner):
+        '''Transfer the outcome of the executor future'''
+        if inner.cancelled():
+            Future.cancel(self)
+            return
+        exc = inner.exception()
+        if isinstance(exc, SolveCancelled):
+            Future.cancel(self)
+            return
+        self.set_running_or_notify_cancel()
+        if exc is not None:
+            self.set_exception(exc)
+        else:
+            self.set_result(inner.result())
+
+
+def _solve_in_process(model, options):
+    '''Solve a (pickled) copy of a model and return its solution for transfer'''
+    model.solve(**options)
+    solution = model.solution
+    solution.model = None
+    if solution.__dict__.pop('_scratch', None) is not None:
+        # Out-of-core scratch files do not outlive the worker
+        solution.K = None
+    return solution
+
+
+def _claim(model):
+    '''Register a background solve of ``model``, checking for shared nodes'''
+    with _in_flight_lock:
+        for other in _in_flight:
+            if other is not model and not other._nodes.isdisjoint(model._nodes):
+                raise Exception(f'{model} shares nodes with {other}, which is being solved')
+        _in_flight[model] = _in_flight.get(model, 0) + 1
+
+
+def _release(model):
+    '''Unregister a finished background solve of ``model``'''
+    with _in_flight_lock:
+        _in_flight[model] -= 1
+        if not _in_flight[model]:
+            del _in_flight[model]
+
+
+def submit(model, executor=None, progress=None, **options):
+    '''
+    Submit a solve of ``model`` to an executor. See ``Model.solve_async``.
+
+    :rtype: SolveFuture
+    '''
+    executor = executor if executor else get_executor()
+    future = SolveFuture()
+    _claim(model)
+
+    if isinstance(executor, ProcessPoolExecutor):
+        future._interruptible = False
+
+        def run():
+            return executor.submit(_solve_in_process, model, options)
+
+        def adopt(inner):
+            solved = not inner.cancelled() and inner.exception() is None
+            try:
+                if solved:
+                    with model._lock:
+                        solution = inner.result()
+                        solution.model = model
+                        model.assign_nodal_DOF_indices()
+                        solution.assign_results()
+                        model.solution = solution
+            finally:
+                _release(model)
+            if solved and progress:
+                progress(model, 'done')
+            future._complete(inner)
+    else:
+        def run():
+            return executor.submit(model.solve, progress=progress,
+                                   cancel=future.cancel_event, **options)
+
+        def adopt(inner):
+            _release(model)
+            future._complete(inner)
+
+    try:
+        if progress:
+            progress(model, 'submitted')
+        inner = run()
+    except BaseException:
+        _release(model)
+        raise
+    future._inner = inner
+    inner.add_done_callback(adopt)
+    return future
@@ -0,0 +1,100 @@
+'''
+A 2D beam element having 2 nodes each with 2 translational and 1 rotational DOF.
+'''
+
+import numpy as np
+from .base import TwoNodeElement
+
+
+class Beam2D(TwoNodeElement):
+    '''
+    A two-dimensional Euler-Bernoulli beam element. Must reside in XY plane.
+    
+    :param Node n1:         Node 1
+    :param Node n2:         Node 2
+    :param Material mat:    Material
+    :param num A:           Cross sectional area
+    :param num I:           Area moment of inertia about the element z axis
+    '''
+    ENAME = 'Beam2D'
+
+    DOF = set([1,2,6])
+    '''Nodal degree-of-freedoms (DOF) - ux (1), uy (2) and rotz (6)'''
+
+    def __init__(self, n1, n2, mat=None, A=None, I=None, num=None):
+        self.n1 = n1
+        self.n2 = n2
+        self.A = A
+        self.I = I
+        super().__init__(num, mat)
+
+    @classmethod
+    def batch_T(cls, elems):
+        '''The displacement transformation matrices, shape ``(n, 6, 6)``'''
+        _, u = cls.batch_geometry(elems)
+        c, s = u[:,0], u[:,1]
+        T = np.zeros((len(elems), 6, 6))
+        for i in (0, 3):
+            T[:,i,i] = T[:,i+1,i+1] = c
+            T[:,i,i+1] = s
+            T[:,i+1,i] = -s
+            T[:,i+2,i+2] = 1
+        return T
+
+    @classmethod
+    def batch_Ke(cls, elems):
+        '''The stiffness matrices in the element coordinate systems, shape ``(n, 6, 6)``'''
+        L, _ = cls.batch_geometry(elems)
+        E = cls.batch_material(elems, 'E')
+        a = E*cls.batch_property(elems, 'A')/L
+        b = E*cls.batch_property(elems, 'I')/L**3
+        Ke = np.zeros((len(elems), 6, 6))
+        Ke[:,0,0] = Ke[:,3,3] = a
+        Ke[:,0,3] = Ke[:,3,0] = -a
+        Ke[:,1,1] = Ke[:,4,4] = 12*b
+        Ke[:,1,4] = Ke[:,4,1] = -12*b
+        Ke[:,1,2] = Ke[:,2,1] = Ke[:,1,5] = Ke[:,5,1] = 6*b*L
+        Ke[:,2,4] = Ke[:,4,2] = Ke[:,4,5] = Ke[:,5,4] = -6*b*L
+        Ke[:,2,2] = Ke[:,5,5] = 4*b*L**2
+        Ke[:,2,5] = Ke[:,5,2] = 2*b*L**2
+        return Ke
+
+    @classmethod
+    def batch_K(cls, elems):
+        '''The global stiffness matrices, ``T^T Ke T``'''
+        T = cls.batch_T(elems)
+        return np.einsum('nji,njk,nkl->nil', T, cls.batch_Ke(elems), T)
+
+    @classmethod
+    def batch_recover(cls, elems, ue):
+        '''
+        Elongation ``d``, axial force ``F``, axial stress ``Sa``, shear force
+        ``V`` and the end moments ``M1``, ``M2`` acting on the element at nodes
+        1 and 2 (counterclockwise positive).
+        '''
+        f = np.einsum('nij,njk,nk->ni', cls.batch_Ke(elems), cls.batch_T(elems), ue)
+        L, _ = cls.batch_geometry(elems)
+        A = cls.batch_property(elems, 'A')
+        return {
+            'd': f[:,3]*L/(cls.batch_material(elems, 'E')*A),
+            'F': f[:,3],
+            'Sa': f[:,3]/A,
+            'V': f[:,1],
+            'M1': f[:,2],
+            'M2': f[:,5]
+        }
+
+    @property
+    def V(self):
+        '''Shear force in member'''
+        return self.results['V']
+
+    @property
+    def M1(self):
+        '''Moment acting on the element at node 1'''
+        return self.results['M1']
+
+    @property
+    def M2(self):
+        '''Moment acting on the element at node 2'''
+        return self.results['M2']
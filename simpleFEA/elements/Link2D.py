@@ -2,12 +2,10 @@
 A 2D link element having 2 nodes each with 2 translational DOF.
 '''
 
-from functools import cached_property
-from numpy import array, cos, sin, dot
-from .base import TwoNodeElement
+from .base import LinkElement
 
 
-class Link2D(TwoNodeElement):
+class Link2D(LinkElement):
     '''
     A two-dimensional link element. Must reside in XY plane.
     
@@ -26,30 +24,3 @@ class Link2D(TwoNodeElement):
         self.n2 = n2
         self.A = A
         super().__init__(num, mat)
-    
-    @cached_property
-    def T(self):
-        """The displacment transformation matrix"""
-        c = cos(self.theta)
-        s = sin(self.theta)
-        return array([
-                [ c, s, 0, 0],
-                [-s, c, 0, 0],
-                [ 0, 0, c, s],
-                [ 0, 0,-s, c]
-            ])
-    
-    @property
-    def Ke(self):
-        '''The stiffness matrix in the element coordinate system'''
-        return self.material.E*self.A/self.L*array([
-                [ 1, 0,-1, 0],
-                [ 0, 0, 0, 0],
-                [-1, 0, 1, 0],
-                [ 0, 0, 0, 0]
-            ])
-
-    @cached_property
-    def K(self):
-        '''The global element stiffness matrix'''
-        return dot(dot(self.T.T, self.Ke), self.T)
\ No newline at end of file
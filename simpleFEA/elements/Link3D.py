@@ -0,0 +1,26 @@
+'''
+A 3D link element having 2 nodes each with 3 translational DOF.
+'''
+
+from .base import LinkElement
+
+
+class Link3D(LinkElement):
+    '''
+    A three-dimensional link element.
+    
+    :param Node n1:         Node 1
+    :param Node n2:         Node 2
+    :param Material mat:    Material
+    :param num A:           Cross sectional area
+    '''
+    ENAME = 'Link3D'
+
+    DOF = set([1,2,3])
+    '''Nodal degree-of-freedoms (DOF) - ux (1), uy (2) and uz (3)'''
+
+    def __init__(self, n1, n2, mat=None, A=None, num=None):
+        self.n1 = n1
+        self.n2 = n2
+        self.A = A
+        super().__init__(num, mat)
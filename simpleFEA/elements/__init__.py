@@ -1 +1,3 @@
-from .Link2D import Link2D
\ No newline at end of file
+from .Link2D import Link2D
+from .Link3D import Link3D
+from .Beam2D import Beam2D
@@ -3,22 +3,61 @@ Base classes for elements.
 '''
 
 import math
+import numpy as np
 from numpy import arctan, pi, dot, array
 from simpleFEA.preprocessing import N_dist
+from simpleFEA.scope import ScopedRegistry, current_scope
+
+
+def element_triplet_groups(elems):
+    '''
+    Yield the global stiffness matrix entries of a list of elements as COO
+    triplets ``(rows, cols, vals)``, one set per element type. Each type group
+    is evaluated with one call to the batched element kernels.
+    '''
+    groups = {}
+    for e in elems:
+        groups.setdefault(type(e), []).append(e)
+    for cls, group in groups.items():
+        dof = cls.batch_dof_map(group)
+        k = dof.shape[1]
+        yield np.repeat(dof, k, axis=1).ravel(), np.tile(dof, (1, k)).ravel(), cls.batch_K(group).ravel()
+
+
+def element_triplets(elems):
+    '''
+    Return the global stiffness matrix entries of a list of elements as COO
+    triplets ``(rows, cols, vals)``. See ``element_triplet_groups``.
+    '''
+    rows, cols, vals = [np.empty(0, int)], [np.empty(0, int)], [np.empty(0)]
+    for r, c, v in element_triplet_groups(elems):
+        rows.append(r)
+        cols.append(c)
+        vals.append(v)
+    return np.concatenate(rows), np.concatenate(cols), np.concatenate(vals)
 
 
 class Element:
     '''
     Base class for all elements.
+
+    Element types implement the batched kernel classmethods ``batch_K``,
+    ``batch_dof_map`` and ``batch_recover``, which operate on a list of
+    elements of that type at once. Assembly and result recovery call them once
+    per element type; the per-element properties (``K``, ``results``) are
+    evaluated with the same kernels.
     
     :param int num:             element number, defaults to *max defined element number + 1*
+                                in the active scope
     :param Material material:   material definition
     '''
-    elements = []
+    elements = ScopedRegistry('elements')
+    '''The elements of the active scope'''
 
     def __init__(self, num=None, material=None):
-        self.num = num if num else self.max_e + 1
-        Element.elements.append(self)
+        self.scope = current_scope()
+        '''The scope the element belongs to'''
+        self.num = self.scope.add_element(self, num)
         self.material = material
         self.solution = {}
         """Store solution quantities here"""
@@ -32,9 +71,57 @@ class Element:
     
     @property
     def max_e(self):
-        '''Max element number defined'''
-        return max([e.num for e in Element.elements] + [0])
+        '''Max element number defined in the element's scope'''
+        return self.scope.max_e
     
+    # Batched element kernels
+    @classmethod
+    def batch_K(cls, elems):
+        '''
+        The global stiffness matrices of a list of elements of this type as an
+        array of shape ``(n, k, k)``, with ``k`` the number of element DOF.
+        '''
+        raise NotImplementedError
+
+    @classmethod
+    def batch_dof_map(cls, elems):
+        '''
+        The global matrix indices of the DOF of a list of elements of this type
+        as an array of shape ``(n, k)``. DOF are ordered by node, then by DOF
+        number.
+        '''
+        dofs = sorted(cls.DOF)
+        return np.array(
+            [ [ n.indices[d] for n in e.nodes for d in dofs ] for e in elems ],
+            dtype=np.int64
+        ).reshape(len(elems), -1)
+
+    @classmethod
+    def batch_recover(cls, elems, ue):
+        '''
+        Recover the element results of a list of elements of this type.
+
+        :param list elems:      The elements
+        :param ndarray ue:      Element DOF displacements, shape ``(n, k)``
+        :return:                A dict of result name to array of shape ``(n,)``
+        '''
+        return {}
+
+    @property
+    def K(self):
+        '''The global element stiffness matrix'''
+        return type(self).batch_K([self])[0]
+
+    @property
+    def ue(self):
+        '''The element DOF displacements from the nodal solution'''
+        return array([ n.solution.get(d, 0) for n in self.nodes for d in sorted(self.DOF) ])
+
+    @property
+    def results(self):
+        '''A dict of the element results evaluated from the nodal solution'''
+        return { k: v[0] for k,v in type(self).batch_recover([self], self.ue[None,:]).items() }
+
     def get_global_index(self, local_index: int) -> int:
         '''
         Return the global index based on the row/col indices of an entry in the
@@ -43,9 +130,8 @@ class Element:
         :param int local_index:     The row or column index of the entry in the
                                     local element stiffness matrix
         '''
-        node = math.floor(local_index/self.nDOF)
-        DOF = local_index - (node)*self.nDOF + 1
-        return self.nodes[node].indices[DOF]
+        node, i = divmod(local_index, self.nDOF)
+        return self.nodes[node].indices[sorted(self.DOF)[i]]
     
     @property
     def nDOF(self):
@@ -68,9 +154,44 @@ class TwoNodeElement(Element):
         super().__init__(num, mat)
         
         # Check that nodes are not coincident
-        if self.n1.x == self.n2.x and self.n1.y == self.n2.y:
+        if N_dist(self.n1, self.n2) == 0:
             raise Exception(f'Nodes for {self} are coindicent.')
 
+    def replace_node(self, old, new):
+        '''
+        Rewire the element from node ``old`` to node ``new``, e.g. when merging
+        coincident nodes.
+        '''
+        if self.n1 is old:
+            self.n1 = new
+        if self.n2 is old:
+            self.n2 = new
+        old.elements.discard(self)
+        new.elements.add(self)
+        new.DOF = new.DOF|self.DOF
+
+    @staticmethod
+    def batch_geometry(elems):
+        '''
+        The lengths and unit direction vectors (n1 to n2) of a list of two-node
+        elements, as arrays of shape ``(n,)`` and ``(n, 3)``.
+        '''
+        xyz = array([ (e.n1.x, e.n1.y, e.n1.z, e.n2.x, e.n2.y, e.n2.z) for e in elems ],
+                    dtype=float).reshape(-1, 6)
+        v = xyz[:,3:] - xyz[:,:3]
+        L = np.linalg.norm(v, axis=1)
+        return L, v/L[:,None]
+
+    @staticmethod
+    def batch_property(elems, name):
+        '''An array of an element attribute (e.g. ``A``) over a list of elements'''
+        return array([ getattr(e, name) for e in elems ], dtype=float)
+
+    @staticmethod
+    def batch_material(elems, name):
+        '''An array of a material property (e.g. ``E``) over a list of elements'''
+        return array([ getattr(e.material, name) for e in elems ], dtype=float)
+
     # Properties
     @property
     def L(self):
@@ -90,19 +211,42 @@ class TwoNodeElement(Element):
     # Post processing
     @property
     def d(self):
-        '''Element elongation, equal to n_j,x - n_i,x'''
-        # Transform first into local element coordinates
-        u1x, u1y, u2x, u2y = dot(self.T, array([
-            self.n1.solution[1], self.n1.solution[2], self.n2.solution[1], self.n2.solution[2]
-        ]))
-        return u2x - u1x
+        '''Element elongation along the element axis'''
+        return self.results['d']
 
     @property
     def F(self):
         '''Axial force in member'''
-        return self.material.E*self.A/self.L*self.d
+        return self.results['F']
 
     @property
     def Sa(self):
         '''Axial stress in element'''
-        return self.F/self.A
\ No newline at end of file
+        return self.results['Sa']
+
+
+class LinkElement(TwoNodeElement):
+    '''
+    Base class for link (truss) elements carrying axial force only. The
+    translational DOF of the element are given by ``DOF``.
+    '''
+
+    @classmethod
+    def batch_K(cls, elems):
+        '''The global stiffness matrices, ``k [[c c^T, -c c^T], [-c c^T, c c^T]]``'''
+        L, c = cls.batch_geometry(elems)
+        c = c[:, [ d - 1 for d in sorted(cls.DOF) ]]
+        k = cls.batch_material(elems, 'E')*cls.batch_property(elems, 'A')/L
+        cc = k[:,None,None]*c[:,:,None]*c[:,None,:]
+        return np.block([[cc, -cc], [-cc, cc]])
+
+    @classmethod
+    def batch_recover(cls, elems, ue):
+        '''Elongation ``d``, axial force ``F`` and axial stress ``Sa``'''
+        L, c = cls.batch_geometry(elems)
+        c = c[:, [ d - 1 for d in sorted(cls.DOF) ]]
+        m = len(cls.DOF)
+        d = np.einsum('ij,ij->i', c, ue[:,m:] - ue[:,:m])
+        A = cls.batch_property(elems, 'A')
+        F = cls.batch_material(elems, 'E')*A/L*d
+        return {'d': d, 'F': F, 'Sa': F/A}
@@ -6,19 +6,28 @@ from numpy import array
 
 
 class Load(object):
-    '''Base class for loads.'''
-    def __init__(self, node, x, y, z):
+    '''
+    Base class for loads.
+
+    ``x``, ``y``, ``z`` are the translational components (DOF 1-3) and ``rx``,
+    ``ry``, ``rz`` the rotational components (DOF 4-6) - moments for forces,
+    rotations for displacements.
+    '''
+    def __init__(self, node, x, y, z, rx=None, ry=None, rz=None):
         self.node = node
         self.x = x
         self.y = y
         self.z = z
+        self.rx = rx
+        self.ry = ry
+        self.rz = rz
         
         node.loads.append(self)
 
         # Record which DOF(s) the force was applied to to set ``DOF``
         self.DOF = set()
         null_value = None if self.type == 'displacement' else 0
-        for i,each in enumerate([x,y,z]):
+        for i,each in enumerate([x,y,z,rx,ry,rz]):
             if each != null_value:
                 self.DOF.add(i+1)
             
@@ -34,10 +43,12 @@ class Load(object):
     
     def value(self, DOF):
         '''Return the component by DOF integer lookup'''
-        assert DOF in [1,2,3]
-        return {1: self.x, 2: self.y, 3: self.z}[DOF]
+        assert DOF in [1,2,3,4,5,6]
+        return {1: self.x, 2: self.y, 3: self.z, 4: self.rx, 5: self.ry, 6: self.rz}[DOF]
         
     def __repr__(self):
+        if self.DOF & {4,5,6}:
+            return f'{self.type.title()}: ({self.x},{self.y},{self.z},{self.rx},{self.ry},{self.rz})'
         return f'{self.type.title()}: ({self.x},{self.y},{self.z})'
     
     __str__ = __repr__
@@ -49,13 +60,14 @@ class Force(Load):
     '''
     A nodal force.
     
-    :param Node node:   the target ``Node`` object
-    :param num x,y,z:   force components
+    :param Node node:       the target ``Node`` object
+    :param num x,y,z:       force components
+    :param num mx,my,mz:    moment components
     '''
     type = 'force'
 
-    def __init__(self, node, x=0, y=0, z=0):
-        super().__init__(node, x, y, z)    
+    def __init__(self, node, x=0, y=0, z=0, mx=0, my=0, mz=0):
+        super().__init__(node, x, y, z, mx, my, mz)    
         node.forces.append(self)
       
 
@@ -63,11 +75,12 @@ class Displacement(Load):
     '''
     A displacement load.
 
-    :param Node node:   The target ``Node`` object
-    :param num x,y,z:   The coordinate displacement values
+    :param Node node:           The target ``Node`` object
+    :param num x,y,z:           The coordinate displacement values
+    :param num rotx,roty,rotz:  The rotation values
     '''
     type = 'displacement'
 
-    def __init__(self, node, x=None, y=None, z=None):
-        super().__init__(node, x, y, z)
+    def __init__(self, node, x=None, y=None, z=None, rotx=None, roty=None, rotz=None):
+        super().__init__(node, x, y, z, rotx, roty, rotz)
         node.disp.append(self)
\ No newline at end of file
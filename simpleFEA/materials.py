@@ -3,18 +3,26 @@ Material object classes.
 '''
 
 from tabulate import tabulate
+from simpleFEA.scope import ScopedRegistry, current_scope
 
 
 class Material:
-    '''Base material class.'''
-    _materials = []
+    '''
+    Base material class.
+
+    :param int num:     material number, defaults to *max defined material
+                        number + 1* in the active scope
+    '''
+    _materials = ScopedRegistry('materials')
 
     def __init__(self, num=None):
-        self.num = num if num else max([m.num for m in Material._materials] + [0])
-        Material._materials.append(self)
+        self.scope = current_scope()
+        self.num = self.scope.add_material(self, num)
     
     def __getattr__(self, prop):
         '''Retrieve a property definition'''
+        if prop.startswith('__') or prop in ('property_dict', 'scope'):
+            raise AttributeError(prop)
         return self.property_dict.get(prop)
 
 
@@ -0,0 +1,276 @@
+'''
+Out-of-core assembly and solution for models larger than memory.
+
+The global stiffness matrix is never held in memory as a whole. Element
+stiffness triplets are generated in chunks into memory-mapped files, reduced to
+CSR form on disk with a counting sort by row followed by a blockwise merge of
+duplicate entries, and the reduced system is solved with a preconditioned
+conjugate gradient method whose matrix-vector products stream over the
+memory-mapped CSR arrays one row block at a time.
+
+The memory budget limits the working arrays that scale with the number of
+stiffness entries: chunks are sized so that the peak of triplet generation and
+of the CSR reduction, temporaries included, stays within it (see
+``WRITE_OVERHEAD`` and ``REDUCE_OVERHEAD``). Arrays that scale with the number
+of DOF are held in memory outside the budget - the row counts and row pointers
+of the reduction (``counts``, ``indptr_raw``, ``cursor``, ``indptr``), the
+solution and force vectors and the iterative solver work vectors - as are the
+node and element objects of the model themselves.
+'''
+
+import os
+import warnings
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import LinearOperator, cg
+from simpleFEA.elements.base import element_triplet_groups
+
+
+DEFAULT_BUDGET = 256*2**20
+'''Default memory budget (bytes) for out-of-core work arrays'''
+
+TRIPLET_BYTES = 3*8
+'''Bytes per stored (row, col, value) triplet'''
+
+WRITE_OVERHEAD = 4
+'''Peak working memory of triplet generation per triplet byte written'''
+
+REDUCE_OVERHEAD = 4
+'''Peak working memory of the CSR reduction per triplet byte processed'''
+
+
+def _memmap(directory, name, dtype, size, mode='w+'):
+    '''Create a 1D memory-mapped array file in ``directory``'''
+    return np.memmap(os.path.join(directory, name), dtype=dtype, mode=mode,
+                     shape=(max(size, 1),))
+
+
+class DiskCSR:
+    '''
+    A square CSR matrix whose ``indices`` and ``data`` arrays are memory-mapped
+    files. Products are computed one row block at a time so that no more than
+    ``block_nnz`` entries are resident at once.
+
+    :param ndarray indptr:      Row pointer array
+    :param memmap indices:      Column indices
+    :param memmap data:         Entry values
+    :param int n:               Number of rows (and columns)
+    :param int block_nnz:       Maximum number of entries per row block
+    '''
+    def __init__(self, indptr, indices, data, n, block_nnz):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.shape = (n, n)
+        self.blocks = self._row_blocks(indptr, block_nnz)
+
+    @staticmethod
+    def _row_blocks(indptr, block_nnz):
+        '''Split the rows into contiguous blocks of at most ``block_nnz`` entries'''
+        blocks = []
+        n = len(indptr) - 1
+        r0 = 0
+        while r0 < n:
+            limit = indptr[r0] + block_nnz
+            r1 = max(int(np.searchsorted(indptr, limit, side='right')) - 1, r0 + 1)
+            r1 = min(r1, n)
+            blocks.append((r0, r1))
+            r0 = r1
+        return blocks
+
+    @property
+    def nnz(self):
+        '''Number of stored entries'''
+        return int(self.indptr[-1])
+
+    def block(self, r0, r1):
+        '''Return rows ``r0:r1`` as an in-memory ``csr_matrix``'''
+        a, b = self.indptr[r0], self.indptr[r1]
+        return csr_matrix(
+            (np.asarray(self.data[a:b]), np.asarray(self.indices[a:b]), self.indptr[r0:r1+1] - a),
+            shape=(r1 - r0, self.shape[1])
+        )
+
+    def dot(self, x):
+        '''Matrix-vector product'''
+        y = np.zeros(self.shape[0])
+        for r0, r1 in self.blocks:
+            y[r0:r1] = self.block(r0, r1).dot(x)
+        return y
+
+    __matmul__ = dot
+
+    def diagonal(self):
+        '''The main diagonal of the matrix'''
+        diag = np.zeros(self.shape[0])
+        for r0, r1 in self.blocks:
+            diag[r0:r1] = self.block(r0, r1).diagonal(k=r0)
+        return diag
+
+    def toarray(self):
+        '''Return the matrix as a dense array (only for small matrices)'''
+        out = np.zeros(self.shape)
+        for r0, r1 in self.blocks:
+            out[r0:r1] = self.block(r0, r1).toarray()
+        return out
+
+
+def write_triplets(elements, directory, budget):
+    '''
+    Generate the element stiffness triplets in chunks into memory-mapped files.
+    Each chunk holds as many elements as fit in ``budget`` including the
+    temporaries of the element kernels.
+
+    :param list elements:   The model elements
+    :param str directory:   Scratch directory for the triplet files
+    :param int budget:      Memory budget in bytes
+    :return:                ``(rows, cols, vals)`` memmaps
+    '''
+    total = sum((e.n_num*e.nDOF)**2 for e in elements)
+    per_element = max([ (cls.n_num*len(cls.DOF))**2 for cls in set(map(type, elements)) ], default=1)
+    rows = _memmap(directory, 'coo_rows.dat', np.int64, total)
+    cols = _memmap(directory, 'coo_cols.dat', np.int64, total)
+    vals = _memmap(directory, 'coo_vals.dat', np.float64, total)
+
+    chunk = max(budget//(TRIPLET_BYTES*WRITE_OVERHEAD*per_element), 1)
+    pos = 0
+    for a in range(0, len(elements), chunk):
+        for r, c, v in element_triplet_groups(elements[a:a+chunk]):
+            rows[pos:pos+len(r)] = r
+            cols[pos:pos+len(r)] = c
+            vals[pos:pos+len(r)] = v
+            pos += len(r)
+    for each in (rows, cols, vals):
+        each.flush()
+    return rows[:total], cols[:total], vals[:total]
+
+
+def reduce_to_csr(rows, cols, vals, n, directory, budget):
+    '''
+    Reduce memory-mapped COO triplets to a ``DiskCSR`` matrix, summing
+    duplicate entries.
+
+    Entries are first distributed to their rows with a counting sort, written
+    to an intermediate set of memmaps. Each block of rows is then loaded,
+    sorted by column and merged into the final arrays. The per-row arrays of
+    length ``n`` are not counted against ``budget``.
+
+    :param int n:           Matrix size
+    :param str directory:   Scratch directory
+    :param int budget:      Memory budget in bytes
+    '''
+    total = len(rows)
+    chunk = max(budget//(TRIPLET_BYTES*REDUCE_OVERHEAD), 1)
+
+    # Count the entries in each row
+    counts = np.zeros(n, dtype=np.int64)
+    for a in range(0, total, chunk):
+        u, c = np.unique(rows[a:a+chunk], return_counts=True)
+        counts[u] += c
+    indptr_raw = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr_raw[1:])
+
+    # Scatter the entries to their rows
+    cols_r = _memmap(directory, 'row_cols.dat', np.int64, total)
+    vals_r = _memmap(directory, 'row_vals.dat', np.float64, total)
+    cursor = indptr_raw[:-1].copy()
+    for a in range(0, total, chunk):
+        r = np.asarray(rows[a:a+chunk])
+        order = np.argsort(r, kind='stable')
+        r = r[order]
+        first = np.searchsorted(r, r, side='left')
+        pos = cursor[r] + np.arange(len(r)) - first
+        cols_r[pos] = cols[a:a+chunk][order]
+        vals_r[pos] = vals[a:a+chunk][order]
+        # Per-chunk work must not scale with n, so no bincount over all rows
+        u, c = np.unique(r, return_counts=True)
+        cursor[u] += c
+    del cursor
+
+    # Merge duplicates one row block at a time
+    indices = _memmap(directory, 'csr_indices.dat', np.int64, total)
+    data = _memmap(directory, 'csr_data.dat', np.float64, total)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    out = 0
+    for r0, r1 in DiskCSR._row_blocks(indptr_raw, chunk):
+        a, b = indptr_raw[r0], indptr_raw[r1]
+        r = np.repeat(np.arange(r0, r1), counts[r0:r1])
+        c = np.asarray(cols_r[a:b])
+        v = np.asarray(vals_r[a:b])
+        order = np.lexsort((c, r))
+        r, c, v = r[order], c[order], v[order]
+        if len(r):
+            new = np.ones(len(r), dtype=bool)
+            new[1:] = (r[1:] != r[:-1]) | (c[1:] != c[:-1])
+            starts = np.flatnonzero(new)
+            r, c, v = r[starts], c[starts], np.add.reduceat(v, starts)
+        indices[out:out+len(c)] = c
+        data[out:out+len(c)] = v
+        indptr[r0+1:r1+1] = out + np.cumsum(np.bincount(r - r0, minlength=r1 - r0))
+        out += len(c)
+    indices.flush()
+    data.flush()
+    del cols_r, vals_r
+    for name in ('row_cols.dat', 'row_vals.dat'):
+        os.remove(os.path.join(directory, name))
+
+    return DiskCSR(indptr, indices[:out], data[:out], n, chunk)
+
+
+def assemble(model, directory, budget=DEFAULT_BUDGET):
+    '''
+    Assemble the global stiffness matrix of ``model`` out of core.
+
+    :param Model model:     The finite element model
+    :param str directory:   Scratch directory for the memory-mapped files
+    :param int budget:      Memory budget in bytes
+    :rtype: DiskCSR
+    '''
+    rows, cols, vals = write_triplets(model.elements, directory, budget)
+    K = reduce_to_csr(rows, cols, vals, model.global_matrix_size, directory, budget)
+    del rows, cols, vals
+    for name in ('coo_rows.dat', 'coo_cols.dat', 'coo_vals.dat'):
+        os.remove(os.path.join(directory, name))
+    return K
+
+
+def solve_reduced(K, keep_ind, F_, tol=1e-10, maxiter=None):
+    '''
+    Solve the reduced system ``K[keep_ind][:,keep_ind] u = F_`` with the
+    Jacobi-preconditioned conjugate gradient method, without forming the
+    reduced matrix.
+
+    The recursively updated residual of CG can drift from the true residual on
+    ill-conditioned systems, so the true residual is computed afterwards and a
+    warning is issued if it is above ``tol``.
+
+    :param DiskCSR K:       The full global stiffness matrix
+    :param keep_ind:        Global indices of the retained DOF
+    :param ndarray F_:      Reduced force vector
+    :param float tol:       Relative residual tolerance
+    :param int maxiter:     Maximum number of iterations
+    :return:                ``(u, residual)`` where ``residual`` is the achieved
+                            relative residual norm
+    '''
+    n = K.shape[0]
+    m = len(keep_ind)
+
+    def matvec(v):
+        x = np.zeros(n)
+        x[keep_ind] = np.ravel(v)
+        return K.dot(x)[keep_ind]
+
+    A = LinearOperator((m, m), matvec=matvec, dtype=float)
+    diag = K.diagonal()[keep_ind]
+    diag[diag == 0] = 1
+    M = LinearOperator((m, m), matvec=lambda v: np.ravel(v)/diag, dtype=float)
+
+    u, info = cg(A, F_, rtol=tol, atol=0, maxiter=maxiter, M=M)
+    if info > 0:
+        raise Exception(f'Out-of-core solve did not converge in {info} iterations')
+    norm = np.linalg.norm(F_)
+    residual = np.linalg.norm(F_ - matvec(u))/(norm if norm else 1)
+    if residual > tol:
+        warnings.warn(f'Out-of-core solve reached a relative residual of '
+                      f'{residual:.3g}, above the tolerance {tol:.3g}')
+    return u, residual
@@ -2,7 +2,12 @@
 Preprocessing classes and functions.
 '''
 
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
 from simpleFEA.loads import Force, Displacement
+from simpleFEA.scope import ScopedRegistry, current_scope
 
 
 def N_dist(n1,n2):
@@ -16,15 +21,18 @@ class Node:
     
     :param num x,y,z:        scalar location components
     :param num num:          node number, defaults to *max defined node number + 1*
+                             in the active scope
     '''
-    nodes = []
+    nodes = ScopedRegistry('nodes')
+    '''The nodes of the active scope'''
 
     def __init__(self, x=0, y=0, z=0, num=None):
+        self.scope = current_scope()
+        '''The scope the node belongs to'''
         self.x = x
         self.y = y
         self.z = z
-        self.num = num if num else self.max_n + 1
-        Node.nodes.append(self)
+        self.num = self.scope.add_node(self, num)
 
         # Initialize property containers
         self.solution = {}
@@ -40,22 +48,44 @@ class Node:
         self.elements = set()
         '''The parent elements this node is attached to'''
     
+    def _coordinate(axis):
+        '''
+        A location component. Setting it bumps the scope's geometry version so
+        that models drop their cached coordinate arrays and node index.
+        '''
+        attr = '_' + axis
+
+        def fget(self):
+            return getattr(self, attr)
+
+        def fset(self, value):
+            setattr(self, attr, value)
+            self.scope.geometry_version += 1
+
+        return property(fget, fset, doc=f'The {axis} location component')
+
+    x = _coordinate('x')
+    y = _coordinate('y')
+    z = _coordinate('z')
+    del _coordinate
+
     @property
     def nDOF(self):
         return len(self.DOF)
     
     @property
     def max_n(self):
-        return max([n.num for n in Node.nodes] + [0])
+        '''Max node number defined in the node's scope'''
+        return self.scope.max_n
     
-    def F(self, x=None, y=None, z=None):
+    def F(self, x=None, y=None, z=None, mx=0, my=0, mz=0):
         '''Apply a force to the node'''
-        f = Force(self,x,y,z)
+        f = Force(self,x,y,z,mx,my,mz)
         return f
 
-    def D(self, x=None, y=None, z=None):
+    def D(self, x=None, y=None, z=None, rotx=None, roty=None, rotz=None):
         '''Apply a displacement to the node'''
-        d = Displacement(self,x,y,z)
+        d = Displacement(self,x,y,z,rotx,roty,rotz)
         return d
     
     def __repr__(self):
@@ -77,4 +107,99 @@ class Node:
         try:
             return self.solution[3]
         except KeyError:
-            return 0
\ No newline at end of file
+            return 0
+
+    @property
+    def rotx(self):
+        '''The rotx rotation solution quantity in the global coordinate system'''
+        return self.solution.get(4, 0)
+
+    @property
+    def roty(self):
+        '''The roty rotation solution quantity in the global coordinate system'''
+        return self.solution.get(5, 0)
+
+    @property
+    def rotz(self):
+        '''The rotz rotation solution quantity in the global coordinate system'''
+        return self.solution.get(6, 0)
+
+
+class NodeIndex:
+    '''
+    Spatial index over a set of nodes for coincident node detection and
+    location queries. Built on a KD-tree of the node coordinates, so
+    construction and queries are O(n log n).
+
+    The index is a snapshot - rebuild it after nodes are moved or added.
+
+    :param list nodes:  The nodes to index
+    '''
+    def __init__(self, nodes):
+        self.nodes = list(nodes)
+        self.coords = np.array([(n.x, n.y, n.z) for n in self.nodes], dtype=float).reshape(-1, 3)
+        self.tree = cKDTree(self.coords)
+
+    def duplicates(self, tol=1e-8):
+        '''
+        Find groups of coincident nodes.
+
+        Nodes within ``tol`` of each other are grouped transitively. Each group
+        is sorted by node number.
+
+        :param num tol:     Distance tolerance
+        :return:            A list of node lists, one per group of 2 or more
+                            coincident nodes
+        '''
+        pairs = self.tree.query_pairs(tol, output_type='ndarray')
+        if not len(pairs):
+            return []
+        n = len(self.nodes)
+        graph = coo_matrix((np.ones(len(pairs)), (pairs[:,0], pairs[:,1])), shape=(n, n))
+        _, labels = connected_components(graph, directed=False)
+        order = np.argsort(labels, kind='stable')
+        bounds = np.flatnonzero(np.diff(labels[order])) + 1
+        groups = []
+        for group in np.split(order, bounds):
+            if len(group) > 1:
+                groups.append(sorted((self.nodes[i] for i in group), key=lambda x: x.num))
+        return groups
+
+    def nearest(self, x=0, y=0, z=0, k=1):
+        '''
+        Return the node nearest to a location, or a list of the ``k`` nearest
+        nodes sorted by distance if ``k > 1``.
+
+        :param num x,y,z:   The query location
+        :param int k:       Number of nodes to return
+        '''
+        k = min(k, len(self.nodes))
+        _, ind = self.tree.query((x, y, z), k=k)
+        if k == 1:
+            return self.nodes[int(ind)]
+        return [ self.nodes[i] for i in ind ]
+
+    def in_box(self, x_min=None, x_max=None, y_min=None, y_max=None, z_min=None, z_max=None):
+        '''
+        Return the nodes inside an axis-aligned box (bounds inclusive), sorted
+        by node number. Bounds left as ``None`` are unbounded.
+        '''
+        if not len(self.nodes):
+            return []
+        lo, hi = self.coords.min(axis=0), self.coords.max(axis=0)
+        for i, (a, b) in enumerate(((x_min, x_max), (y_min, y_max), (z_min, z_max))):
+            lo[i] = lo[i] if a is None else a
+            hi[i] = hi[i] if b is None else b
+        if np.any(lo > hi):
+            return []
+        center = (lo + hi)/2
+        radius = (hi - lo).max()/2
+        ind = np.asarray(self.tree.query_ball_point(center, radius, p=np.inf), dtype=int)
+        pts = self.coords[ind]
+        ind = ind[np.all((pts >= lo) & (pts <= hi), axis=1)]
+        return sorted((self.nodes[i] for i in ind), key=lambda x: x.num)
+
+    def within(self, x=0, y=0, z=0, r=0):
+        '''Return the nodes within distance ``r`` of a location, sorted by node number'''
+        ind = self.tree.query_ball_point((x, y, z), r)
+        return sorted((self.nodes[i] for i in ind), key=lambda x: x.num)
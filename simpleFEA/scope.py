@@ -0,0 +1,166 @@
+'''
+Model scopes owning nodes, elements and materials.
+
+Every ``Node``, ``Element``, ``Material`` and ``Model`` belongs to the scope
+that is active when it is created. Each scope numbers its entities
+independently, so separate scopes (e.g. one per model in a long-running
+service, or one per thread) do not interfere. Without an explicit scope
+everything belongs to the process-wide default scope.
+
+Activate a scope with a ``with`` block::
+
+    with Scope('bracket') as scope:
+        n1 = Node(0, 0)
+        n2 = Node(10, 0)
+        e1 = Link2D(n1, n2, mat, A=0.25)
+        model = Model('bracket', [e1])
+
+    ...
+
+    scope.close()    # Release everything created in the scope
+
+The active scope is held in a context variable, so it is local to the
+current thread and ``asyncio`` task. The same scope may be entered from several
+threads or tasks at once.
+
+Scopes hold their nodes, elements and materials strongly (they are the
+``Node.nodes``, ``Element.elements`` and ``Material._materials`` registries)
+and their models weakly, so a model that is dropped is freed together with its
+solution even if its scope stays open (a solution refers to its model weakly). The default scope is never closed
+automatically: everything created outside an explicit scope stays registered
+for the life of the process. Long-running processes should build each model in
+its own scope, or call ``default_scope().close()`` to release the default
+scope's nodes, elements and materials.
+'''
+
+import contextvars
+import threading
+import weakref
+
+
+class Scope:
+    '''
+    A registry of nodes, elements, materials and models with independent
+    numbering.
+
+    :param str name:    Name of scope (optional)
+    '''
+    def __init__(self, name=None):
+        self.name = name if name else ''
+        self.nodes = []
+        self.elements = []
+        self.materials = []
+        self.models = weakref.WeakSet()
+        '''The live models of the scope'''
+        self.max_n = 0
+        '''Max node number defined'''
+        self.max_e = 0
+        '''Max element number defined'''
+        self.max_m = 0
+        '''Max material number defined'''
+        self.geometry_version = 0
+        '''Incremented whenever a node of the scope is moved'''
+        self._lock = threading.Lock()
+
+    def _register(self, registry, counter, obj, num):
+        '''Add ``obj`` to a registry and return its number'''
+        with self._lock:
+            num = num if num else getattr(self, counter) + 1
+            setattr(self, counter, max(getattr(self, counter), num))
+            registry.append(obj)
+        return num
+
+    def add_node(self, node, num=None):
+        '''Register a node, returning its number (next free if ``num`` is not given)'''
+        return self._register(self.nodes, 'max_n', node, num)
+
+    def add_element(self, element, num=None):
+        '''Register an element, returning its number (next free if ``num`` is not given)'''
+        return self._register(self.elements, 'max_e', element, num)
+
+    def add_material(self, material, num=None):
+        '''Register a material, returning its number (next free if ``num`` is not given)'''
+        return self._register(self.materials, 'max_m', material, num)
+
+    def add_model(self, model):
+        '''Register a model'''
+        with self._lock:
+            self.models.add(model)
+
+    def close(self):
+        '''
+        Release all nodes, elements, materials and models of the scope.
+
+        The references between them (nodes to their elements and loads, models
+        to their solutions) are cleared, so they are freed as soon as the
+        caller drops its own references. Numbering restarts at 1.
+        '''
+        with self._lock:
+            for n in self.nodes:
+                n.elements = set()
+                n.loads, n.forces, n.disp = [], [], []
+                n.solution = {}
+            for e in self.elements:
+                e.solution = {}
+            for m in list(self.models):
+                m.solution = None
+                m._invalidate()
+            self.nodes, self.elements, self.materials = [], [], []
+            self.models = weakref.WeakSet()
+            self.max_n = self.max_e = self.max_m = 0
+
+    def __enter__(self):
+        # Tokens are kept per context, as the scope may be entered concurrently
+        _tokens.set(_tokens.get() + (_current.set(self),))
+        return self
+
+    def __exit__(self, *exc):
+        tokens = _tokens.get()
+        _tokens.set(tokens[:-1])
+        _current.reset(tokens[-1])
+
+    def __getstate__(self):
+        # A pickled scope keeps its numbering but not its registries, so that
+        # pickling one model does not pull in everything else in the scope
+        state = self.__dict__.copy()
+        state.update(nodes=[], elements=[], materials=[])
+        del state['_lock'], state['models']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.models = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f'Scope {self.name} ({len(self.nodes)} nodes, {len(self.elements)} elements)'
+
+
+_default = Scope('default')
+_current = contextvars.ContextVar('simpleFEA_scope', default=_default)
+_tokens = contextvars.ContextVar('simpleFEA_scope_tokens', default=())
+
+
+def current_scope():
+    '''Return the active scope'''
+    return _current.get()
+
+
+def default_scope():
+    '''Return the process-wide default scope'''
+    return _default
+
+
+class ScopedRegistry:
+    '''
+    Class attribute giving a registry of the active scope, e.g. ``Node.nodes``
+    is the list of nodes of the active scope.
+
+    :param str name:    The registry attribute of ``Scope``
+    '''
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, obj, cls=None):
+        scope = obj.scope if obj is not None and 'scope' in obj.__dict__ else current_scope()
+        return getattr(scope, self.name)
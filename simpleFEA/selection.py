@@ -0,0 +1,264 @@
+'''
+Node and element selection (ANSYS NSEL/ESEL style).
+
+A selection is a boolean mask over the nodes or elements of a model, in
+``Model.nodes`` / ``Model.elements`` order. Selection criteria are evaluated on
+the model's cached coordinate, connectivity, property and result arrays and
+return a new selection, so they chain as a reselection::
+
+    top = model.nsel().box(y=(10, 10))
+    critical = model.esel().material(mat).result('Sa', min=30e3, absolute=True)
+    print(critical.pretab())
+
+Selections combine with ``&`` (intersection), ``|`` (union), ``-``
+(difference) and ``~`` (complement within the model).
+'''
+
+import csv
+import numpy as np
+
+
+class Selection:
+    '''
+    Base class for selections.
+
+    :param Model model:     The model to select from
+    :param ndarray mask:    Boolean mask of selected entities, defaults to all
+    '''
+    def __init__(self, model, mask=None):
+        self.model = model
+        self.mask = np.ones(len(self._all), dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+
+    @property
+    def _all(self):
+        '''All entities of the model in selection order'''
+        raise NotImplementedError
+
+    def _new(self, mask):
+        return type(self)(self.model, mask)
+
+    def _check(self, other):
+        if type(other) is not type(self) or other.model is not self.model:
+            raise Exception(f'Cannot combine {self} with {other}')
+
+    def __and__(self, other):
+        self._check(other)
+        return self._new(self.mask & other.mask)
+
+    def __or__(self, other):
+        self._check(other)
+        return self._new(self.mask | other.mask)
+
+    def __sub__(self, other):
+        self._check(other)
+        return self._new(self.mask & ~other.mask)
+
+    def __invert__(self):
+        return self._new(~self.mask)
+
+    def __len__(self):
+        return int(self.mask.sum())
+
+    def __iter__(self):
+        return iter(self.items)
+
+    @property
+    def indices(self):
+        '''Positions of the selected entities in the model order'''
+        return np.flatnonzero(self.mask)
+
+    @property
+    def items(self):
+        '''A list of the selected entities'''
+        entities = self._all
+        return [ entities[i] for i in self.indices ]
+
+    def where(self, values, min=None, max=None, absolute=False):
+        '''
+        Reselect by an array of values (in model order) within bounds.
+
+        :param ndarray values:  One value per entity in the model
+        :param num min,max:     Inclusive bounds, ``None`` for unbounded
+        :param bool absolute:   Compare absolute values
+        '''
+        values = np.abs(values) if absolute else np.asarray(values)
+        mask = self.mask.copy()
+        if min is not None:
+            mask &= values >= min
+        if max is not None:
+            mask &= values <= max
+        return self._new(mask)
+
+    def to_csv(self, file, *items):
+        '''
+        Export the selected entities and the named quantities to a CSV file.
+
+        :param file:        File path or writable file object
+        :param str items:   Names of quantities, see ``values``
+        '''
+        columns = [ self.nums ] + [ self.values(i)[self.mask] for i in items ]
+        rows = zip(*columns)
+        if hasattr(file, 'write'):
+            return self._write_csv(file, items, rows)
+        with open(file, 'w', newline='') as f:
+            self._write_csv(f, items, rows)
+
+    def _write_csv(self, f, items, rows):
+        writer = csv.writer(f)
+        writer.writerow([self.label] + list(items))
+        writer.writerows(rows)
+
+    def _solution(self):
+        '''The model solution, checked to match the current mesh'''
+        solution = self.model.solution
+        if solution is None:
+            raise Exception(f'{self.model} has not been solved')
+        if solution.stale:
+            raise Exception(f'{self.model} has changed since it was solved')
+        return solution
+
+    def __repr__(self):
+        return f'{type(self).__name__} of {len(self)} of {len(self.mask)} in {self.model}'
+
+
+class NodeSelection(Selection):
+    '''A selection of the nodes of a model'''
+    label = 'Node'
+
+    @property
+    def _all(self):
+        return self.model.nodes
+
+    @property
+    def nums(self):
+        '''Array of the selected node numbers'''
+        return self.model.node_nums[self.mask]
+
+    @property
+    def coords(self):
+        '''Array of the selected node coordinates'''
+        return self.model.node_coords[self.mask]
+
+    def values(self, name):
+        '''
+        Array over all model nodes of a coordinate (``x``, ``y``, ``z``) or a
+        nodal result (``ux``, ``uy``, ``uz``, ``rotx``, ``roty``, ``rotz``)
+        '''
+        if name in ('x', 'y', 'z'):
+            return self.model.node_coords[:, 'xyz'.index(name)]
+        return self._solution().nodal_results[name]
+
+    def box(self, x=None, y=None, z=None):
+        '''
+        Reselect nodes inside a box, given as inclusive ``(min, max)`` bounds
+        per axis. Axes left as ``None`` are unbounded.
+        '''
+        xyz = self.model.node_coords
+        mask = self.mask.copy()
+        for i, bounds in enumerate((x, y, z)):
+            if bounds is not None:
+                mask &= (xyz[:,i] >= bounds[0]) & (xyz[:,i] <= bounds[1])
+        return self._new(mask)
+
+    def attached(self, elems):
+        '''Reselect nodes attached to the elements of an ``ElementSelection``'''
+        attached = self.model.connectivity.T.dot(elems.mask.astype(float)) > 0
+        return self._new(self.mask & attached)
+
+    def result(self, name, min=None, max=None, absolute=False):
+        '''Reselect nodes by a coordinate or nodal result within bounds'''
+        return self.where(self.values(name), min, max, absolute)
+
+    @property
+    def extents(self):
+        '''
+        The bounds of the selected nodes in each axis.
+
+        Returns a tuple:  (x_min, x_max, y_min, y_max, z_min, z_max)
+        '''
+        xyz = self.coords
+        if not len(xyz):
+            return None
+        lo, hi = xyz.min(axis=0), xyz.max(axis=0)
+        return tuple(float(v) for v in (lo[0], hi[0], lo[1], hi[1], lo[2], hi[2]))
+
+    @property
+    def prnsol(self):
+        '''Print the nodal displacement solution of the selected nodes'''
+        return self._solution().nodal_solution(self.items)
+
+    @property
+    def prrsol(self):
+        '''Print the nodal force reaction solution of the selected nodes'''
+        return self._solution().reaction_solution(self.items)
+
+
+class ElementSelection(Selection):
+    '''A selection of the elements of a model'''
+    label = 'Element'
+
+    @property
+    def _all(self):
+        return self.model.elements
+
+    @property
+    def nums(self):
+        '''Array of the selected element numbers'''
+        return self.model.element_nums[self.mask]
+
+    def values(self, name):
+        '''
+        Array over all model elements of the area (``A``) or an element result
+        (``F``, ``Sa``, ...)
+        '''
+        if name == 'A':
+            return self.model.element_areas
+        results = self._solution().element_results
+        if name not in results:
+            return np.full(len(self.mask), np.nan)
+        return results[name]
+
+    def type(self, *classes):
+        '''Reselect elements of the given element classes'''
+        mask = np.array([ isinstance(e, classes) for e in self._all ], dtype=bool)
+        return self._new(self.mask & mask.reshape(-1))
+
+    def material(self, *materials):
+        '''Reselect elements having one of the given materials'''
+        ids = np.array([ id(m) for m in materials ], dtype=np.int64)
+        return self._new(self.mask & np.isin(self.model.element_material_ids, ids))
+
+    def area(self, min=None, max=None):
+        '''Reselect elements with cross sectional area within bounds'''
+        return self.where(self.model.element_areas, min, max)
+
+    def attached(self, nodes, all=False):
+        '''
+        Reselect elements attached to the nodes of a ``NodeSelection``.
+
+        :param NodeSelection nodes:     The nodes
+        :param bool all:                Require all element nodes to be selected
+                                        instead of any
+        '''
+        C = self.model.connectivity
+        count = C.dot(nodes.mask.astype(float))
+        mask = count == np.diff(C.indptr) if all else count > 0
+        return self._new(self.mask & mask)
+
+    def result(self, name, min=None, max=None, absolute=False):
+        '''Reselect elements by area or an element result within bounds'''
+        return self.where(self.values(name), min, max, absolute)
+
+    @property
+    def nodes(self):
+        '''A ``NodeSelection`` of the nodes attached to the selected elements'''
+        return NodeSelection(self.model).attached(self)
+
+    @property
+    def extents(self):
+        '''The bounds of the nodes of the selected elements, see ``NodeSelection.extents``'''
+        return self.nodes.extents
+
+    def pretab(self, *items):
+        '''Print element results of the selected elements, by default ``F`` and ``Sa``'''
+        return self._solution().element_table(self.items, items if items else ('F','Sa'))
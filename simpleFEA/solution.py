@@ -2,32 +2,106 @@
 Solution-level classes.
 '''
 
+import tempfile
+import warnings
+import weakref
 import numpy as np
-from scipy.sparse import lil_matrix
-from scipy.sparse.linalg import spsolve
+from scipy.sparse import coo_matrix
+from scipy.sparse.linalg import LinearOperator, gmres, spsolve, splu
+from scipy.sparse.linalg import norm as spnorm
 from tabulate import tabulate
+from simpleFEA import outofcore
+from simpleFEA.elements.base import element_triplets
+
+
+class SolveCancelled(Exception):
+    '''Raised when a solve is cancelled'''
 
 
 class Solution:
-    '''Base class for solution objects'''
+    '''
+    Base class for solution objects.
+
+    A solution refers to its model weakly, so that the model and its solution
+    do not form a reference cycle and are freed as soon as the model is
+    dropped. Keep a reference to the model while using its solution.
+    '''
     def __init__(self, model):
         self.model = model
+        self.progress = None
+        """Callback ``progress(model, phase)`` called at the start of each solve phase"""
+        self.cancel_event = None
+        """A ``threading.Event`` checked at each phase; when set the solve raises
+        ``SolveCancelled``"""
+        self.nodal_results = {}
+        """Nodal result arrays by name (``ux``, ``uy``, ...) in ``model.nodes`` order"""
+        self.element_results = {}
+        """Element result arrays by name (``F``, ``Sa``, ...) in ``model.elements``
+        order, NaN for elements not having the result"""
+        self.stale = False
+        """Set when the model mesh changes after the solve; the result arrays
+        then no longer match the model's node and element order"""
     
+    @property
+    def model(self):
+        '''The solved model, ``None`` once it has been freed'''
+        return self._model() if self._model is not None else None
+
+    @model.setter
+    def model(self, model):
+        self._model = weakref.ref(model) if model is not None else None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_model'] = self.model
+        return state
+
+    def __setstate__(self, state):
+        model = state.pop('_model')
+        self.__dict__.update(state)
+        self.model = model
+
     @property
     def prnsol(self):
         '''Print the nodal displacement solution'''
-        table = [ [n.num, n.ux, n.uy, n.uz] for n in self.model.nodes ]
+        return self.nodal_solution()
+
+    def nodal_solution(self, nodes=None):
+        '''
+        Print the nodal displacement solution for a list (or ``NodeSelection``)
+        of nodes, by default all nodes in the model
+        '''
+        nodes = self.model.nodes if nodes is None else nodes
+        table = [ [n.num, n.ux, n.uy, n.uz] for n in nodes ]
         return '\nNodal Displacement Solution\n\n' + \
             tabulate(table, headers=['Node','ux','uy','uz'], tablefmt='presto') + '\n'
     
     def __repr__(self):
         return f'{self.name} for {self.model}'
+
+    def phase(self, name):
+        '''Start solve phase ``name``: check for cancellation and report progress'''
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise SolveCancelled(f'Solve of {self.model} cancelled before {name}')
+        if self.progress:
+            self.progress(self.model, name)
     
     @property
     def prrsol(self):
         '''Print the nodal force reaction solution'''
+        return self.reaction_solution()
+
+    def reaction_solution(self, nodes=None):
+        '''
+        Print the nodal force reaction solution for the constrained nodes in a
+        list (or ``NodeSelection``) of nodes, by default all nodes in the model
+        '''
+        constrained = self.model.constrained_nodes
+        if nodes is not None:
+            nodes = set(nodes)
+            constrained = [ n for n in constrained if n in nodes ]
         table = []
-        for n in sorted(self.model.constrained_nodes, key=lambda n: n.num):
+        for n in sorted(constrained, key=lambda n: n.num):
             ndr = []
             for d in n.disp:
                 for i in range(1,4):
@@ -40,26 +114,93 @@ class Solution:
         return '\nNodal Force Reaction Solution\n\n' + \
             tabulate(table, headers=['Node','Fx','Fy','Fz'], tablefmt='presto') + '\n'
 
+    def element_table(self, elems=None, items=('F','Sa')):
+        '''
+        Print element results for a list (or ``ElementSelection``) of
+        elements, by default all elements in the model
+
+        :param tuple items:     Names of the element results to print
+        '''
+        elems = self.model.elements if elems is None else elems
+        table = [ [e.num] + [ e.solution.get(i) for i in items ] for e in elems ]
+        return '\nElement Solution\n\n' + \
+            tabulate(table, headers=['Element'] + list(items), tablefmt='presto') + '\n'
+
 
 class LinearSolution(Solution):
     '''
     Linear static structural solver.
 
-    :param Model model: The input finite element model
+    With ``out_of_core=True`` the global stiffness matrix is assembled into
+    memory-mapped files in ``scratch_dir`` and the reduced system is solved
+    iteratively, keeping the working arrays that scale with the number of
+    stiffness entries within ``memory_budget`` bytes. Arrays that scale with
+    the number of DOF are outside the budget. A warning is issued if the true
+    relative residual of the iterative solution is above ``tol``. See
+    :mod:`simpleFEA.outofcore`.
+
+    With ``precision='mixed'`` the reduced stiffness matrix is factorized in
+    single precision and the solution is brought to double precision accuracy
+    by GMRES-based iterative refinement, with residuals computed against the
+    double precision matrix (see ``refine``). If refinement does not converge,
+    e.g. for matrices too ill-conditioned for a single precision factorization,
+    the system is re-solved in double precision with a warning. The relative
+    residual and backward error after each step are kept in ``residuals`` and
+    ``backward_errors``.
+
+    :param Model model:         The input finite element model
+    :param bool out_of_core:    Assemble and solve out of core
+    :param int memory_budget:   Memory budget in bytes for out-of-core work arrays
+    :param str scratch_dir:     Parent directory for out-of-core scratch files
+                                (defaults to the system temporary directory)
+    :param float tol:           Relative residual tolerance of the out-of-core
+                                iterative solver and of mixed precision
+                                refinement
+    :param str precision:       ``'double'`` or ``'mixed'`` - precision of the
+                                direct factorization
+    :param int max_refine:      Maximum number of refinement steps
     '''
     name = 'Linear Structural Solver'
-    
+
+    def __init__(self, model, out_of_core=False, memory_budget=None, scratch_dir=None,
+                 tol=1e-10, precision='double', max_refine=10):
+        super().__init__(model)
+        if precision not in ('double', 'mixed'):
+            raise Exception(f'Unknown precision "{precision}"')
+        if precision == 'mixed' and out_of_core:
+            raise Exception('Mixed precision applies to the in-core direct solver only')
+        self.out_of_core = out_of_core
+        self.memory_budget = memory_budget if memory_budget else outofcore.DEFAULT_BUDGET
+        self.scratch_dir = scratch_dir
+        self.tol = tol
+        self.precision = precision
+        self.max_refine = max_refine
+        self.backward_tol = 1e-14
+        """Backward error at which mixed precision refinement has reached
+        double precision accuracy"""
+        self.inner_tol = 1e-6
+        """Relative tolerance of the GMRES solve in each refinement step"""
+        self.inner_iter = 30
+        """Maximum GMRES iterations in each refinement step"""
+        self.residual = None
+        """Achieved relative residual norm of the reduced system"""
+        self.residuals = []
+        """Relative residual norms after each mixed precision refinement step"""
+        self.backward_errors = []
+        """Normwise backward errors after each mixed precision refinement step"""
+
     def solve(self):
         '''Solve the matrix equations to determine the displacement solution'''
         # ------------------------------ ASSEMBLY ------------------------------
+        self.phase('assembly')
         # Assemble the global stiffness matrix
-        K = lil_matrix( (self.model.global_matrix_size, self.model.global_matrix_size) )
-        for e in self.model.elements:
-            for row,row_data in enumerate(e.K):
-                for col,entry in enumerate(row_data):
-                    row_g = e.get_global_index(row)
-                    col_g = e.get_global_index(col)
-                    K[row_g, col_g] += entry
+        if self.out_of_core:
+            self._scratch = tempfile.TemporaryDirectory(prefix='simpleFEA-', dir=self.scratch_dir)
+            K = outofcore.assemble(self.model, self._scratch.name, self.memory_budget)
+        else:
+            n = self.model.global_matrix_size
+            rows, cols, vals = element_triplets(self.model.elements)
+            K = coo_matrix( (vals, (rows, cols)), shape=(n, n) ).tocsr()
         self.K = K
 
         # Augment the displacement vector with applied displacements
@@ -77,6 +218,7 @@ class LinearSolution(Solution):
         self.F = F
 
         # ------------------------------ SOLUTION ------------------------------
+        self.phase('solution')
         # Reduce matrices at locations of zero displacement
         keep_ind = []
         for i,each in enumerate(U):
@@ -84,18 +226,110 @@ class LinearSolution(Solution):
                 keep_ind.append(i)
         
         F_ = F[keep_ind]
-        K_ = K[:,keep_ind][keep_ind].tocsr()
 
         # Solve
-        self.U_ = spsolve(K_,F_)
+        if self.out_of_core:
+            self.U_, self.residual = outofcore.solve_reduced(K, keep_ind, F_, self.tol)
+        else:
+            K_ = K[:,keep_ind][keep_ind].tocsr()
+            if self.precision == 'mixed':
+                self.U_ = self.refine(K_,F_)
+            else:
+                self.U_ = spsolve(K_,F_)
+                self.residual = self.relative_residual(K_,F_,self.U_)
 
         # ------------------------------ RECOVERY ------------------------------
+        self.phase('recovery')
         # Assemble the full displacement solution
         self.U_total = self.U.copy()
         self.U_total[keep_ind] = self.U_
-        self.F_total = np.dot(self.K.toarray(),self.U_total)
-        
+        self.U_total = self.U_total.astype(float)
+        self.F_total = self.K.dot(self.U_total)
+        self.assign_results()
+
+    def assign_results(self):
+        '''Assign the displacement solution to the nodes and recover element results'''
         # Assign displacmement results to nodes
-        for n in self.model.nodes:
+        nodes = self.model.nodes
+        index = np.full((len(nodes), 6), -1)
+        for i,n in enumerate(nodes):
             for DOF,ind in n.indices.items():
                 n.solution.update({DOF: self.U_total[ind]})
+                index[i,DOF-1] = ind
+        values = np.where(index >= 0, self.U_total[index], 0)
+        self.nodal_results = dict(zip(['ux','uy','uz','rotx','roty','rotz'], values.T))
+
+        # Recover element results, one batched call per element type
+        groups = {}
+        for i,e in enumerate(self.model.elements):
+            groups.setdefault(type(e), []).append((i, e))
+        self.element_results = {}
+        for cls, group in groups.items():
+            pos, elems = [ i for i,_ in group ], [ e for _,e in group ]
+            ue = self.U_total[cls.batch_dof_map(elems)]
+            results = cls.batch_recover(elems, ue)
+            for i, e in enumerate(elems):
+                e.solution.update({ k: v[i] for k,v in results.items() })
+            for k,v in results.items():
+                self.element_results.setdefault(k, np.full(self.model.num_elems, np.nan))[pos] = v
+
+    @staticmethod
+    def relative_residual(K, F, U):
+        '''The relative residual norm ``|F - K U|/|F|``'''
+        norm = np.linalg.norm(F)
+        return np.linalg.norm(F - K.dot(U))/(norm if norm else 1)
+
+    @staticmethod
+    def backward_error(K, F, U):
+        '''The normwise backward error ``|F - K U|/(|K| |U| + |F|)`` in the infinity norm'''
+        scale = spnorm(K, np.inf)*np.abs(U).max() + np.abs(F).max()
+        return np.abs(F - K.dot(U)).max()/(scale if scale else 1)
+
+    def refine(self, K, F):
+        '''
+        Solve ``K U = F`` by GMRES-based iterative refinement: ``K`` is
+        factorized in single precision, and each refinement step solves for the
+        correction to the double precision residual with GMRES on ``K``, left
+        preconditioned by the single precision factors.
+
+        Refinement stops once the relative residual reaches ``tol`` or the
+        backward error reaches ``backward_tol`` (the accuracy of a double
+        precision direct solve), or when the backward error stops decreasing.
+        If neither tolerance was met the single precision factors are released
+        and the system is solved in double precision.
+        '''
+        lu = splu(K.astype(np.float32).tocsc())
+
+        def precondition(r):
+            # Scale the residual so it does not underflow in single precision
+            scale = np.abs(r).max()
+            scale = scale if scale else 1
+            return lu.solve((r/scale).astype(np.float32)).astype(np.float64)*scale
+
+        A = LinearOperator(K.shape, matvec=lambda x: precondition(K.dot(x)), dtype=np.float64)
+        U = precondition(F)
+        self.residuals = [self.relative_residual(K,F,U)]
+        self.backward_errors = [self.backward_error(K,F,U)]
+
+        def converged():
+            return self.residuals[-1] <= self.tol or self.backward_errors[-1] <= self.backward_tol
+
+        for _ in range(self.max_refine):
+            if converged():
+                break
+            dU, _ = gmres(A, precondition(F - K.dot(U)), rtol=self.inner_tol, atol=0,
+                          restart=self.inner_iter, maxiter=1)
+            U = U + dU
+            self.residuals.append(self.relative_residual(K,F,U))
+            self.backward_errors.append(self.backward_error(K,F,U))
+            if self.backward_errors[-1] >= self.backward_errors[-2]:
+                break
+        self.residual = self.residuals[-1]
+
+        if not converged():
+            del lu, A
+            warnings.warn(f'Mixed precision refinement stalled at backward error '
+                          f'{self.backward_errors[-1]:.3g}, solving in double precision')
+            U = spsolve(K,F)
+            self.residual = self.relative_residual(K,F,U)
+        return U